@@ -8,49 +8,1096 @@ Removes all Windows-specific dependencies for reliable operation
 import os
 import sys
 import json
+import re
+import mmap
+import struct
 import time
 import threading
+import queue
 import platform
+import importlib
+import atexit
+import errno
+import functools
+import importlib.util
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from operator import attrgetter
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple, Callable, NamedTuple, Iterator
+from dataclasses import dataclass
 import logging
+import uuid
 import subprocess
 import ctypes
 from ctypes import wintypes
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger("audio_handler")
 
+# Host platform, resolved once at import
+_SYSTEM = platform.system()
+_IS_WINDOWS = _SYSTEM == "Windows"
+_IS_LINUX = _SYSTEM == "Linux"
+
+# Device enumeration is slow on Windows (each PortAudio/WASAPI query can take
+# 100ms+ per device), so results are shared across handler instances and
+# refreshed after a short TTL or when Windows reports a device change.
+ENUM_CACHE_TTL = 30.0
+WM_DEVICECHANGE = 0x0219
+_ENUM_CACHE: Dict[str, Any] = {"ts": 0.0, "devices": None, "device_count": None, "drivers": None}
+_enum_cache_lock = threading.Lock()
+_device_listener_started = False
+
+# Streaming playback: frames per callback block and blocks read ahead of the device
+STREAM_BLOCKSIZE = 2048
+STREAM_PREFETCH_BLOCKS = 8
+# Frames per callback when playing a buffer already in memory (nothing to read ahead)
+LOW_LATENCY_BLOCKSIZE = 256
+
+# Format verdicts (process-wide LRU) and audio info (per handler), keyed by (path, mtime_ns, size)
+FORMAT_CACHE_SIZE = 256
+# Extensions (without the dot) listed as audio files in the output directory
+AUDIO_EXTENSIONS = frozenset({"mp3", "wav", "ogg", "m4a", "flac", "aac"})
+# Listings with at least this many audio files stat them on a small thread pool
+LIST_PARALLEL_STAT_MIN = 512
+LIST_STAT_WORKERS = 4
+# A directory changed more recently than this is rescanned even if its mtime matches
+LIST_CACHE_SETTLE_S = 1.0
+# Suffixes the playback backends are expected to handle
+PLAYABLE_FORMATS = frozenset({".wav", ".mp3", ".ogg", ".m4a", ".flac"})
+# Bytes per sample for the libsndfile subtypes we report a sample width for
+_SUBTYPE_WIDTHS = {"PCM_S8": 1, "PCM_U8": 1, "PCM_16": 2, "PCM_24": 3, "PCM_32": 4, "FLOAT": 4, "DOUBLE": 8}
+# Bytes read when validating a WAV: enough for RIFF, fmt, and any LIST chunks
+WAV_HEADER_READ = 4096
+
+# Sample types sounddevice/PortAudio accept without conversion
+SD_NATIVE_DTYPES = frozenset({"uint8", "int16", "int32", "float32"})
+# (zero offset, scale to [-1, 1)) for integer PCM normalized to float32
+_PCM_FLOAT_SCALE = {
+    "int8": (0, 1.0 / 128.0),
+    "uint8": (128, 1.0 / 128.0),
+    "int16": (0, 1.0 / 32768.0),
+    "int32": (0, 1.0 / 2147483648.0),
+}
+
+# Volume boost applied to pydub-decoded audio for better audibility
+PYDUB_GAIN_DB = 5.0
+PYDUB_GAIN = 10 ** (PYDUB_GAIN_DB / 20)
+
+# WAV files kept in memory for repeat PlaySound calls
+WINSOUND_BUFFER_CACHE_SIZE = 4
+
+# Upper bound on waiting for a backend to confirm playback has started; the
+# wait normally ends as soon as the backend call returns
+PLAYBACK_START_TIMEOUT = 0.5
+# How often the worker checks whether pygame music has finished
+PYGAME_POLL_INTERVAL = 0.02
+# Finished playbacks remembered for wait_for_playback()
+PLAYBACK_HISTORY = 16
+# Upper bound on a deep test_audio_system run
+LIBRARY_TEST_TIMEOUT = 5.0
+
+
+def invalidate_device_cache() -> None:
+    """Force the next device/driver query to re-enumerate"""
+    _ENUM_CACHE["ts"] = 0.0
+
+
+def _enum_cache_lookup(key: str, compute):
+    """Return a cached enumeration result, recomputing it once the TTL expires"""
+    with _enum_cache_lock:
+        now = time.monotonic()
+        if now - _ENUM_CACHE["ts"] >= ENUM_CACHE_TTL:
+            _ENUM_CACHE.update(ts=now, devices=None, device_count=None, drivers=None)
+        value = _ENUM_CACHE[key]
+    if value is None:
+        value = compute()
+        _ENUM_CACHE[key] = value
+    return value
+
+
+def _cached_query_devices():
+    """Return sounddevice's device list, reusing a recent enumeration"""
+    def query():
+        import sounddevice as sd
+        return sd.query_devices()
+    return _enum_cache_lookup("devices", query)
+
+
+def _cached_device_count() -> int:
+    """Number of PortAudio devices, without building sounddevice's per-device dicts"""
+    def query():
+        import sounddevice as sd
+        devices = _ENUM_CACHE["devices"]
+        if devices is not None:
+            return len(devices)
+        count = sd._lib.Pa_GetDeviceCount()
+        if count < 0:
+            sd._check(count)
+        return count
+    return _enum_cache_lookup("device_count", query)
+
+
+def _run_device_change_window() -> None:
+    """Pump a hidden window's messages, invalidating the cache on WM_DEVICECHANGE"""
+    user32 = ctypes.windll.user32
+    kernel32 = ctypes.windll.kernel32
+
+    WNDPROC = ctypes.WINFUNCTYPE(ctypes.c_ssize_t, wintypes.HWND, wintypes.UINT,
+                                 wintypes.WPARAM, wintypes.LPARAM)
+
+    class WNDCLASSW(ctypes.Structure):
+        _fields_ = [
+            ("style", wintypes.UINT),
+            ("lpfnWndProc", WNDPROC),
+            ("cbClsExtra", ctypes.c_int),
+            ("cbWndExtra", ctypes.c_int),
+            ("hInstance", wintypes.HINSTANCE),
+            ("hIcon", wintypes.HICON),
+            ("hCursor", wintypes.HANDLE),
+            ("hbrBackground", wintypes.HBRUSH),
+            ("lpszMenuName", wintypes.LPCWSTR),
+            ("lpszClassName", wintypes.LPCWSTR),
+        ]
+
+    user32.DefWindowProcW.argtypes = [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+    user32.DefWindowProcW.restype = ctypes.c_ssize_t
+    user32.CreateWindowExW.restype = wintypes.HWND
+
+    def wnd_proc(hwnd, msg, wparam, lparam):
+        if msg == WM_DEVICECHANGE:
+            invalidate_device_cache()
+        return user32.DefWindowProcW(hwnd, msg, wparam, lparam)
+
+    proc = WNDPROC(wnd_proc)
+    wndclass = WNDCLASSW()
+    wndclass.lpfnWndProc = proc
+    wndclass.hInstance = kernel32.GetModuleHandleW(None)
+    wndclass.lpszClassName = "KokoroAudioDeviceListener"
+    if not user32.RegisterClassW(ctypes.byref(wndclass)):
+        raise ctypes.WinError()
+
+    # A hidden top-level window (message-only windows miss broadcasts)
+    hwnd = user32.CreateWindowExW(0, wndclass.lpszClassName, None, 0, 0, 0, 0, 0,
+                                  None, None, wndclass.hInstance, None)
+    if not hwnd:
+        raise ctypes.WinError()
+
+    msg = wintypes.MSG()
+    while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+        user32.TranslateMessage(ctypes.byref(msg))
+        user32.DispatchMessageW(ctypes.byref(msg))
+
+
+def _start_device_change_listener() -> None:
+    """Invalidate the enumeration cache whenever Windows reports a device change
+    
+    Prefers Core Audio endpoint notifications; falls back to WM_DEVICECHANGE
+    broadcasts to a hidden window.
+    """
+    global _device_listener_started
+    if not _IS_WINDOWS or _device_listener_started:
+        return
+    _device_listener_started = True
+
+    def listen():
+        try:
+            _register_endpoint_notifications()
+            # Keep this thread (and with it the MTA) alive for the callbacks
+            threading.Event().wait()
+        except Exception as e:
+            logger.info("Endpoint notifications unavailable (%s), watching WM_DEVICECHANGE", e)
+        try:
+            _run_device_change_window()
+        except Exception as e:
+            logger.warning("Device change listener unavailable, relying on cache TTL: %s", e)
+
+    threading.Thread(target=listen, name="audio-device-listener", daemon=True).start()
+
+
+# (format tag, bits per sample) -> numpy dtype for WAV payloads viewable as-is
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+_WAV_DTYPES = {
+    (WAVE_FORMAT_PCM, 8): "u1",
+    (WAVE_FORMAT_PCM, 16): "<i2",
+    (WAVE_FORMAT_PCM, 32): "<i4",
+    (WAVE_FORMAT_IEEE_FLOAT, 32): "<f4",
+}
+
+
+def _parse_wav_header(header: bytes) -> Optional[Dict[str, Any]]:
+    """Parse the fmt and data chunk headers from the first bytes of a WAV file
+    
+    Returns sample_rate, channels, bits_per_sample, format_tag, data_offset and
+    data_size, or None if either chunk header lies beyond `header`.
+    """
+    fmt = None
+    pos = 12
+    while pos + 8 <= len(header):
+        chunk_id, size = struct.unpack_from('<4sI', header, pos)
+        body = pos + 8
+        if chunk_id == b'fmt ':
+            if body + 16 > len(header):
+                return None
+            format_tag, channels, sample_rate, _, _, bits = struct.unpack_from('<HHIIHH', header, body)
+            if format_tag == WAVE_FORMAT_EXTENSIBLE and size >= 40 and body + 26 <= len(header):
+                format_tag = struct.unpack_from('<H', header, body + 24)[0]
+            fmt = {
+                "format_tag": format_tag,
+                "sample_rate": sample_rate,
+                "channels": channels,
+                "bits_per_sample": bits
+            }
+        elif chunk_id == b'data':
+            if fmt is None:
+                return None
+            fmt.update(data_offset=body, data_size=size)
+            return fmt
+        pos = body + size + (size & 1)
+    return None
+
+
+def _wav_duration(fmt: Dict[str, Any], file_size: int) -> float:
+    """Playing time in seconds of a WAV described by `_parse_wav_header`
+    
+    The data size is clamped to the file, since streamed WAVs may carry a
+    0xFFFFFFFF placeholder and truncated files claim more than they hold.
+    """
+    if "data_offset" not in fmt:
+        return 0.0
+    frame_bytes = fmt["channels"] * fmt["bits_per_sample"] // 8
+    if not frame_bytes or not fmt["sample_rate"]:
+        return 0.0
+    data_size = max(0, min(fmt["data_size"], file_size - fmt["data_offset"]))
+    return data_size // frame_bytes / fmt["sample_rate"]
+
+
+# MPEG audio Layer III frame header tables, indexed by the header's version bits
+_MP3_BITRATES_KBPS = {
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),   # MPEG-1
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),       # MPEG-2/2.5
+}
+_MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+MP3_HEADER_READ = 4096
+
+
+def _parse_mp3_header(file_path: Path, size: int) -> Optional[Dict[str, Any]]:
+    """Sample rate, channels and duration from the first MPEG Layer III frame
+    
+    Skips an ID3v2 tag, then reads the frame header and, when present, the
+    Xing/Info frame count for an exact VBR duration; otherwise the duration is
+    estimated from the bitrate. Returns None if no Layer III frame is found.
+    """
+    with open(file_path, 'rb') as f:
+        head = f.read(10)
+        start = 0
+        if head[:3] == b'ID3' and len(head) == 10:
+            # Syncsafe tag size, plus the footer when flagged
+            tag_size = (head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9]
+            start = 10 + tag_size + (10 if head[5] & 0x10 else 0)
+        f.seek(start)
+        data = f.read(MP3_HEADER_READ)
+    
+    pos = data.find(b'\xff')
+    while 0 <= pos <= len(data) - 4:
+        header = struct.unpack_from('>I', data, pos)[0]
+        version = (header >> 19) & 3     # 3: MPEG-1, 2: MPEG-2, 0: MPEG-2.5
+        layer = (header >> 17) & 3       # 1: Layer III
+        bitrate_index = (header >> 12) & 0xF
+        rate_index = (header >> 10) & 3
+        if ((header >> 21) & 0x7FF) == 0x7FF and version != 1 and layer == 1 \
+                and 0 < bitrate_index < 15 and rate_index < 3:
+            break
+        pos = data.find(b'\xff', pos + 1)
+    else:
+        return None
+    
+    mpeg1 = version == 3
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+    channels = 1 if (header >> 6) & 3 == 3 else 2
+    samples_per_frame = 1152 if mpeg1 else 576
+    
+    # The Xing/Info header sits after the side information of the first frame
+    side_info = (32 if channels == 2 else 17) if mpeg1 else (17 if channels == 2 else 9)
+    xing = pos + 4 + side_info
+    duration = None
+    if data[xing:xing + 4] in (b'Xing', b'Info') and len(data) >= xing + 12:
+        flags = struct.unpack_from('>I', data, xing + 4)[0]
+        if flags & 1:
+            frames = struct.unpack_from('>I', data, xing + 8)[0]
+            duration = frames * samples_per_frame / sample_rate
+    if duration is None:
+        bitrate = _MP3_BITRATES_KBPS[1 if mpeg1 else 2][bitrate_index] * 1000
+        duration = (size - start - pos) * 8 / bitrate
+    
+    return {
+        "duration_ms": int(duration * 1000),
+        "duration_seconds": duration,
+        "channels": channels,
+        "sample_rate": sample_rate,
+    }
+
+
+def _map_wav_samples(file_path: Path, fmt: Dict[str, Any]):
+    """Zero-copy view of a WAV file's samples as (sample_rate, samples, channels)
+    
+    Uses the header already parsed into `fmt`: the file is memory-mapped and
+    the data chunk wrapped with np.frombuffer, so no sample bytes are copied.
+    Returns None for layouts numpy can't view directly (e.g. 24-bit PCM) so
+    callers can fall back to scipy.
+    """
+    import numpy as np
+    
+    dtype = _WAV_DTYPES.get((fmt["format_tag"], fmt["bits_per_sample"]))
+    if dtype is None:
+        return None
+    
+    with open(file_path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    channels = fmt["channels"]
+    offset = fmt["data_offset"]
+    # Streamed WAVs may carry a placeholder size; trust the file length
+    size = min(fmt["data_size"], len(mm) - offset)
+    frame_bytes = channels * fmt["bits_per_sample"] // 8
+    samples = np.frombuffer(mm, dtype=dtype, count=(size // frame_bytes) * channels, offset=offset)
+    if channels > 1:
+        samples = samples.reshape(-1, channels)
+    return fmt["sample_rate"], samples, channels
+
+
+def _map_wav_pcm24(file_path: Path, fmt: Dict[str, Any]):
+    """Zero-copy (sample_rate, bytes, channels) view of a 24-bit PCM WAV
+    
+    The bytes come back as a uint8 array of shape (frames, channels * 3) for
+    `_pcm24_to_int32` to widen block by block.
+    """
+    import numpy as np
+    
+    with open(file_path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    channels = fmt["channels"]
+    offset = fmt["data_offset"]
+    size = min(fmt["data_size"], len(mm) - offset)
+    frame_bytes = channels * 3
+    frames = size // frame_bytes
+    raw = np.frombuffer(mm, dtype=np.uint8, count=frames * frame_bytes, offset=offset)
+    return fmt["sample_rate"], raw.reshape(frames, frame_bytes), channels
+
+
+def _pcm24_to_int32(raw, channels: int):
+    """Widen packed little-endian 24-bit samples to left-aligned int32"""
+    import numpy as np
+    b = raw.reshape(len(raw), channels, 3).astype(np.int32)
+    return (b[..., 0] << 8) | (b[..., 1] << 16) | (b[..., 2] << 24)
+
+
+# Known Windows MCI error codes and their remedies
+MCI_SOLUTIONS = {
+    "263": {
+        "description": "The specified device is not open or is not recognized by MCI",
+        "solutions": [
+            "Update audio drivers",
+            "Try running as administrator",
+            "Use alternative audio library (sounddevice/pygame)",
+            "Check Windows audio service is running"
+        ]
+    },
+    "259": {
+        "description": "The driver cannot recognize the specified command parameter",
+        "solutions": [
+            "Convert audio to WAV format",
+            "Check audio file is not corrupted",
+            "Try different audio library"
+        ]
+    },
+    "277": {
+        "description": "The file format is invalid",
+        "solutions": [
+            "Convert to WAV format",
+            "Check file is not corrupted",
+            "Use pydub for format conversion"
+        ]
+    }
+}
+_MCI_RE = re.compile(r'\b(' + '|'.join(map(re.escape, MCI_SOLUTIONS)) + r')\b')
+
+
+def _error_keyword_re(*keywords: str) -> re.Pattern:
+    """Compile a case-insensitive single-pass matcher for backend error keywords"""
+    return re.compile('|'.join(map(re.escape, keywords)), re.IGNORECASE)
+
+
+# Error text that points at the Windows audio stack rather than the file
+_MCI_ERROR_RE = _error_keyword_re("263", "MCI")
+
+
+# pygame mixer format: Kokoro's native rate/channels, ~11ms per buffer
+PYGAME_MIXER_FREQUENCY = 24000
+PYGAME_MIXER_CHANNELS = 1
+PYGAME_MIXER_BUFFER = 256
+
+_pygame_mixer_lock = threading.Lock()
+_pygame_mixer_initialized = False
+
+
+def _ensure_pygame_mixer(buffer: int = PYGAME_MIXER_BUFFER):
+    """Open pygame's mixer once per process and keep it open until exit
+    
+    `buffer` (samples) only applies to the call that actually opens the mixer.
+    """
+    global _pygame_mixer_initialized
+    import pygame
+    if _pygame_mixer_initialized and pygame.mixer.get_init():
+        return pygame.mixer
+    with _pygame_mixer_lock:
+        if not pygame.mixer.get_init():
+            # Match Kokoro's mono 24 kHz output so SDL doesn't resample
+            pygame.mixer.pre_init(frequency=PYGAME_MIXER_FREQUENCY, size=-16,
+                                  channels=PYGAME_MIXER_CHANNELS, buffer=buffer)
+            pygame.mixer.init()
+        if not _pygame_mixer_initialized:
+            atexit.register(pygame.mixer.quit)
+            _pygame_mixer_initialized = True
+    return pygame.mixer
+
+
+# Win32 service control and Core Audio (MMDevice) constants
+SC_MANAGER_CONNECT = 0x0001
+SERVICE_QUERY_STATUS = 0x0004
+SC_STATUS_PROCESS_INFO = 0
+SERVICE_RUNNING = 0x00000004
+COINIT_MULTITHREADED = 0x0
+CLSCTX_ALL = 0x17
+E_RENDER = 0
+DEVICE_STATE_ACTIVE = 0x1
+STGM_READ = 0x0
+RPC_E_CHANGED_MODE = -2147417850
+CREATE_NO_WINDOW = 0x08000000
+SND_ASYNC = 0x0001
+SND_NODEFAULT = 0x0002
+SND_MEMORY = 0x0004
+E_NOINTERFACE = -2147467262
+
+
+class _GUID(ctypes.Structure):
+    _fields_ = [
+        ("Data1", ctypes.c_uint32),
+        ("Data2", ctypes.c_uint16),
+        ("Data3", ctypes.c_uint16),
+        ("Data4", ctypes.c_ubyte * 8),
+    ]
+
+    @classmethod
+    def from_string(cls, value: str) -> "_GUID":
+        return cls.from_buffer_copy(uuid.UUID(value).bytes_le)
+
+
+class _PROPERTYKEY(ctypes.Structure):
+    _fields_ = [("fmtid", _GUID), ("pid", wintypes.DWORD)]
+
+
+class _PROPVARIANT(ctypes.Structure):
+    _fields_ = [
+        ("vt", ctypes.c_ushort),
+        ("reserved1", ctypes.c_ushort),
+        ("reserved2", ctypes.c_ushort),
+        ("reserved3", ctypes.c_ushort),
+        ("pwszVal", ctypes.c_wchar_p),
+        ("padding", ctypes.c_void_p),
+    ]
+
+
+class _SERVICE_STATUS_PROCESS(ctypes.Structure):
+    _fields_ = [(name, wintypes.DWORD) for name in (
+        "dwServiceType", "dwCurrentState", "dwControlsAccepted", "dwWin32ExitCode",
+        "dwServiceSpecificExitCode", "dwCheckPoint", "dwWaitHint", "dwProcessId",
+        "dwServiceFlags",
+    )]
+
+
+CLSID_MMDeviceEnumerator = _GUID.from_string("{BCDE0395-E52F-467C-8E3D-C4579291692E}")
+IID_IMMDeviceEnumerator = _GUID.from_string("{A95664D2-9614-4F35-A746-DE8DB63617E6}")
+IID_IMMNotificationClient = _GUID.from_string("{7991EEC9-7E89-4D85-8390-6C703CEC60C0}")
+IID_IUnknown = _GUID.from_string("{00000000-0000-0000-C000-000000000046}")
+PKEY_Device_FriendlyName = _PROPERTYKEY(_GUID.from_string("{A45C254E-DF1C-4EFD-8020-67D146A850E0}"), 14)
+
+
+def _query_audio_service_running() -> bool:
+    """Read the AudioSrv state from the Service Control Manager"""
+    advapi32 = ctypes.windll.advapi32
+    advapi32.OpenSCManagerW.restype = ctypes.c_void_p
+    advapi32.OpenServiceW.restype = ctypes.c_void_p
+    advapi32.OpenServiceW.argtypes = [ctypes.c_void_p, wintypes.LPCWSTR, wintypes.DWORD]
+    advapi32.QueryServiceStatusEx.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p,
+                                              wintypes.DWORD, ctypes.POINTER(wintypes.DWORD)]
+    advapi32.CloseServiceHandle.argtypes = [ctypes.c_void_p]
+
+    scm = advapi32.OpenSCManagerW(None, None, SC_MANAGER_CONNECT)
+    if not scm:
+        raise ctypes.WinError()
+    try:
+        service = advapi32.OpenServiceW(scm, "AudioSrv", SERVICE_QUERY_STATUS)
+        if not service:
+            raise ctypes.WinError()
+        try:
+            status = _SERVICE_STATUS_PROCESS()
+            needed = wintypes.DWORD()
+            if not advapi32.QueryServiceStatusEx(service, SC_STATUS_PROCESS_INFO, ctypes.byref(status),
+                                                 ctypes.sizeof(status), ctypes.byref(needed)):
+                raise ctypes.WinError()
+            return status.dwCurrentState == SERVICE_RUNNING
+        finally:
+            advapi32.CloseServiceHandle(service)
+    finally:
+        advapi32.CloseServiceHandle(scm)
+
+
+def _com_method(obj: ctypes.c_void_p, index: int, *argtypes):
+    """Bind vtable slot `index` of a raw COM interface pointer"""
+    vtable = ctypes.cast(obj, ctypes.POINTER(ctypes.POINTER(ctypes.c_void_p)))[0]
+    prototype = ctypes.WINFUNCTYPE(ctypes.HRESULT, ctypes.c_void_p, *argtypes)
+    method = prototype(vtable[index])
+    return lambda *args: method(obj, *args)
+
+
+def _com_release(obj: ctypes.c_void_p) -> None:
+    if obj:
+        vtable = ctypes.cast(obj, ctypes.POINTER(ctypes.POINTER(ctypes.c_void_p)))[0]
+        ctypes.WINFUNCTYPE(ctypes.c_ulong, ctypes.c_void_p)(vtable[2])(obj)
+
+
+def _enumerate_audio_endpoints() -> List[str]:
+    """Friendly names of active playback endpoints via IMMDeviceEnumerator"""
+    ole32 = ctypes.windll.ole32
+    # Each calling thread joins the MTA; CoInitializeEx is per-thread
+    hr = ole32.CoInitializeEx(None, COINIT_MULTITHREADED)
+    if hr < 0 and hr != RPC_E_CHANGED_MODE:
+        raise ctypes.WinError(hr)
+
+    enumerator = ctypes.c_void_p()
+    collection = ctypes.c_void_p()
+    names = []
+    try:
+        ole32.CoCreateInstance(ctypes.byref(CLSID_MMDeviceEnumerator), None, CLSCTX_ALL,
+                               ctypes.byref(IID_IMMDeviceEnumerator), ctypes.byref(enumerator))
+        if not enumerator:
+            raise OSError("MMDeviceEnumerator unavailable")
+
+        # IMMDeviceEnumerator::EnumAudioEndpoints
+        _com_method(enumerator, 3, ctypes.c_int, wintypes.DWORD, ctypes.POINTER(ctypes.c_void_p))(
+            E_RENDER, DEVICE_STATE_ACTIVE, ctypes.byref(collection))
+        count = wintypes.UINT()
+        # IMMDeviceCollection::GetCount
+        _com_method(collection, 3, ctypes.POINTER(wintypes.UINT))(ctypes.byref(count))
+
+        for i in range(count.value):
+            device = ctypes.c_void_p()
+            store = ctypes.c_void_p()
+            try:
+                # IMMDeviceCollection::Item, IMMDevice::OpenPropertyStore
+                _com_method(collection, 4, wintypes.UINT, ctypes.POINTER(ctypes.c_void_p))(i, ctypes.byref(device))
+                _com_method(device, 4, wintypes.DWORD, ctypes.POINTER(ctypes.c_void_p))(STGM_READ, ctypes.byref(store))
+                value = _PROPVARIANT()
+                # IPropertyStore::GetValue
+                _com_method(store, 5, ctypes.POINTER(_PROPERTYKEY), ctypes.POINTER(_PROPVARIANT))(
+                    ctypes.byref(PKEY_Device_FriendlyName), ctypes.byref(value))
+                if value.pwszVal:
+                    names.append(value.pwszVal)
+                ole32.PropVariantClear(ctypes.byref(value))
+            finally:
+                _com_release(store)
+                _com_release(device)
+    finally:
+        _com_release(collection)
+        _com_release(enumerator)
+        if hr >= 0:
+            ole32.CoUninitialize()
+    return names
+
+
+# Objects backing the registered IMMNotificationClient; must outlive the registration
+_notification_refs: List[Any] = []
+
+
+def _register_endpoint_notifications() -> None:
+    """Register an IMMNotificationClient that invalidates the enumeration cache
+    
+    The COM object is built by hand: a struct whose first field points at a
+    vtable of ctypes callbacks. It lives for the rest of the process.
+    """
+    ole32 = ctypes.windll.ole32
+    hr = ole32.CoInitializeEx(None, COINIT_MULTITHREADED)
+    if hr < 0:
+        raise ctypes.WinError(hr)
+
+    HRESULT = ctypes.c_long
+    known_iids = (bytes(IID_IUnknown), bytes(IID_IMMNotificationClient))
+
+    def query_interface(this, riid, ppv):
+        if bytes(riid.contents) in known_iids:
+            ppv[0] = this
+            return 0
+        ppv[0] = None
+        return E_NOINTERFACE
+
+    def ref_count(this):
+        return 1  # static lifetime
+
+    def on_device_change(this, *args):
+        invalidate_device_cache()
+        return 0
+
+    def on_property_changed(this, device_id, key):
+        return 0
+
+    callbacks = [
+        ctypes.WINFUNCTYPE(HRESULT, ctypes.c_void_p, ctypes.POINTER(_GUID),
+                           ctypes.POINTER(ctypes.c_void_p))(query_interface),
+        ctypes.WINFUNCTYPE(ctypes.c_ulong, ctypes.c_void_p)(ref_count),  # AddRef
+        ctypes.WINFUNCTYPE(ctypes.c_ulong, ctypes.c_void_p)(ref_count),  # Release
+        # OnDeviceStateChanged(id, state)
+        ctypes.WINFUNCTYPE(HRESULT, ctypes.c_void_p, wintypes.LPCWSTR, wintypes.DWORD)(on_device_change),
+        # OnDeviceAdded(id), OnDeviceRemoved(id)
+        ctypes.WINFUNCTYPE(HRESULT, ctypes.c_void_p, wintypes.LPCWSTR)(on_device_change),
+        ctypes.WINFUNCTYPE(HRESULT, ctypes.c_void_p, wintypes.LPCWSTR)(on_device_change),
+        # OnDefaultDeviceChanged(flow, role, id)
+        ctypes.WINFUNCTYPE(HRESULT, ctypes.c_void_p, ctypes.c_int, ctypes.c_int,
+                           wintypes.LPCWSTR)(on_device_change),
+        # OnPropertyValueChanged(id, key) fires constantly and doesn't affect the cache
+        ctypes.WINFUNCTYPE(HRESULT, ctypes.c_void_p, wintypes.LPCWSTR, _PROPERTYKEY)(on_property_changed),
+    ]
+    vtable = (ctypes.c_void_p * len(callbacks))(*[ctypes.cast(cb, ctypes.c_void_p) for cb in callbacks])
+    client = ctypes.c_void_p(ctypes.addressof(vtable))
+
+    enumerator = ctypes.c_void_p()
+    ole32.CoCreateInstance(ctypes.byref(CLSID_MMDeviceEnumerator), None, CLSCTX_ALL,
+                           ctypes.byref(IID_IMMDeviceEnumerator), ctypes.byref(enumerator))
+    if not enumerator:
+        raise OSError("MMDeviceEnumerator unavailable")
+    # IMMDeviceEnumerator::RegisterEndpointNotificationCallback
+    _com_method(enumerator, 6, ctypes.c_void_p)(ctypes.byref(client))
+    _notification_refs.extend([callbacks, vtable, client, enumerator])
+
+
+def _join_mmcss_pro_audio() -> Optional[int]:
+    """Register the calling thread with MMCSS's "Pro Audio" task
+    
+    The scheduler then favours the thread over normal work, so feeding
+    the device doesn't stall when the process loses focus or the CPU is
+    busy. The registration lasts for the thread's lifetime; returns the
+    task handle, or None when MMCSS is unavailable.
+    """
+    try:
+        avrt = ctypes.windll.avrt
+        avrt.AvSetMmThreadCharacteristicsW.argtypes = [wintypes.LPCWSTR, ctypes.POINTER(wintypes.DWORD)]
+        avrt.AvSetMmThreadCharacteristicsW.restype = wintypes.HANDLE
+        task_index = wintypes.DWORD(0)
+        handle = avrt.AvSetMmThreadCharacteristicsW("Pro Audio", ctypes.byref(task_index))
+        if not handle:
+            raise ctypes.WinError()
+        return handle
+    except Exception as e:
+        logger.info("MMCSS registration unavailable: %s", e)
+        return None
+
+
+def _query_sound_devices_cim() -> List[str]:
+    """Names of sound devices reporting status OK, via PowerShell CIM (no console window)"""
+    result = subprocess.run(
+        ['powershell', '-NoProfile', '-NonInteractive', '-Command',
+         'Get-CimInstance Win32_SoundDevice | ForEach-Object { "$($_.Name)|$($_.Status)" }'],
+        capture_output=True,
+        text=True,
+        timeout=3,
+        creationflags=CREATE_NO_WINDOW
+    )
+    names = []
+    for line in result.stdout.splitlines():
+        name, _, status = line.rpartition('|')
+        if name and status.strip() == 'OK':
+            names.append(name.strip())
+    return names
+
+
+# statx(2): only the fields we read, and no forced revalidation on network filesystems
+AT_FDCWD = -100
+AT_STATX_DONT_SYNC = 0x4000
+STATX_TYPE = 0x0001
+STATX_MTIME = 0x0040
+STATX_SIZE = 0x0200
+
+
+class _StatxTimestamp(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_int64), ("tv_nsec", ctypes.c_uint32), ("_reserved", ctypes.c_int32)]
+
+
+class _Statx(ctypes.Structure):
+    _fields_ = [
+        ("stx_mask", ctypes.c_uint32),
+        ("stx_blksize", ctypes.c_uint32),
+        ("stx_attributes", ctypes.c_uint64),
+        ("stx_nlink", ctypes.c_uint32),
+        ("stx_uid", ctypes.c_uint32),
+        ("stx_gid", ctypes.c_uint32),
+        ("stx_mode", ctypes.c_uint16),
+        ("_spare0", ctypes.c_uint16),
+        ("stx_ino", ctypes.c_uint64),
+        ("stx_size", ctypes.c_uint64),
+        ("stx_blocks", ctypes.c_uint64),
+        ("stx_attributes_mask", ctypes.c_uint64),
+        ("stx_atime", _StatxTimestamp),
+        ("stx_btime", _StatxTimestamp),
+        ("stx_ctime", _StatxTimestamp),
+        ("stx_mtime", _StatxTimestamp),
+        ("_rest", ctypes.c_uint64 * 16),  # rdev/dev and spare space up to 256 bytes
+    ]
+
+
+class _FastStat(NamedTuple):
+    """The subset of os.stat_result the handler uses"""
+    st_size: int
+    st_mtime: float
+    st_mtime_ns: int
+    st_mode: int
+
+
+_statx_unsupported = False
+
+
+@functools.lru_cache(maxsize=None)
+def _libc_statx():
+    """libc's statx wrapper, or None where it doesn't exist"""
+    if not _IS_LINUX:
+        return None
+    try:
+        statx = ctypes.CDLL(None, use_errno=True).statx
+    except (OSError, AttributeError):
+        return None
+    statx.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_uint, ctypes.POINTER(_Statx)]
+    statx.restype = ctypes.c_int
+    return statx
+
+
+def _fast_stat(path) -> _FastStat:
+    """Size, mtime and type of a file; statx(AT_STATX_DONT_SYNC) on Linux, os.stat elsewhere"""
+    global _statx_unsupported
+    statx = None if _statx_unsupported else _libc_statx()
+    if statx is not None:
+        buf = _Statx()
+        if statx(AT_FDCWD, os.fsencode(path), AT_STATX_DONT_SYNC,
+                 STATX_TYPE | STATX_MTIME | STATX_SIZE, ctypes.byref(buf)) == 0:
+            mtime = buf.stx_mtime
+            mtime_ns = mtime.tv_sec * 1_000_000_000 + mtime.tv_nsec
+            return _FastStat(buf.stx_size, mtime_ns / 1e9, mtime_ns, buf.stx_mode)
+        err = ctypes.get_errno()
+        if err not in (errno.ENOSYS, errno.EPERM):
+            raise OSError(err, os.strerror(err), str(path))
+        # Kernel too old or syscall filtered (seccomp): stop trying
+        _statx_unsupported = True
+    st = os.stat(path)
+    return _FastStat(st.st_size, st.st_mtime, st.st_mtime_ns, st.st_mode)
+
+
+@functools.lru_cache(maxsize=256)
+def _abs_str(path: str) -> str:
+    """Absolute form of a path, memoized (the server never changes its working directory)"""
+    return os.path.abspath(path)
+
+
+def _is_path_within_root(path: Path, root: Path) -> bool:
+    """Whether a resolved path lies inside a resolved root directory"""
+    try:
+        path.relative_to(root)
+    except ValueError:
+        return False
+    return True
+
+
+def _size_kb(n: int) -> float:
+    """Size in KiB to two decimals (half-up), in integer arithmetic"""
+    return ((n * 100 + 512) // 1024) / 100.0
+
+
+def _ffprobe_audio_info(file_path: Path) -> Dict[str, Any]:
+    """Stream metadata from ffprobe's container header read (no decode)"""
+    result = subprocess.run(
+        ['ffprobe', '-v', 'quiet', '-show_streams', '-select_streams', 'a:0',
+         '-print_format', 'json', str(file_path)],
+        capture_output=True,
+        text=True,
+        timeout=5,
+        creationflags=CREATE_NO_WINDOW if _IS_WINDOWS else 0
+    )
+    streams = json.loads(result.stdout or "{}").get("streams") or []
+    if not streams:
+        raise RuntimeError(f"ffprobe found no audio stream (exit {result.returncode})")
+    stream = streams[0]
+    duration = float(stream.get("duration", 0.0))
+    info = {
+        "duration_ms": int(duration * 1000),
+        "duration_seconds": duration,
+        "channels": int(stream.get("channels", 0)),
+        "sample_rate": int(stream.get("sample_rate", 0)),
+    }
+    bits = int(stream.get("bits_per_sample") or stream.get("bits_per_raw_sample") or 0)
+    if bits:
+        info["sample_width"] = bits // 8
+    return info
+
+
+@functools.lru_cache(maxsize=FORMAT_CACHE_SIZE)
+def _format_info_cached(path_str: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Format verdict for one version of a file; mtime_ns and size key the cache"""
+    format_info = {
+        "valid": False,
+        "format": os.path.splitext(path_str)[1].lower(),
+        "size_bytes": size,
+        "recommendations": []
+    }
+    
+    # Check file extension
+    if format_info["format"] not in PLAYABLE_FORMATS:
+        format_info["recommendations"].append(f"Unsupported format {format_info['format']}. Convert to WAV for best compatibility.")
+    
+    # Check file size (empty files cause issues)
+    elif size < 100:
+        format_info["recommendations"].append("File too small, may be corrupted or empty.")
+    
+    else:
+        # Read the header bytes for additional validation
+        read_size = WAV_HEADER_READ if format_info["format"] == ".wav" else 12
+        fd = os.open(path_str, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        try:
+            header = os.read(fd, read_size)
+        finally:
+            os.close(fd)
+        
+        if format_info["format"] == ".wav":
+            if header.startswith(b'RIFF') and header[8:12] == b'WAVE':
+                format_info["valid"] = True
+                # Keep the layout so playback can map samples without re-parsing
+                format_info.update(_parse_wav_header(header) or {})
+            else:
+                format_info["recommendations"].append("Invalid WAV file header.")
+        elif format_info["format"] == ".mp3":
+            if header.startswith((b'ID3', b'\xff\xfb')):
+                format_info["valid"] = True
+            else:
+                format_info["recommendations"].append("Invalid MP3 file header.")
+        else:
+            # For other formats, assume valid if we got this far
+            format_info["valid"] = True
+    
+    return format_info
+
+
+@functools.lru_cache(maxsize=None)
+def _module_installed(module_name: str) -> bool:
+    """find_spec lookup (a path search, no module code runs), shared by all handlers"""
+    return importlib.util.find_spec(module_name) is not None
+
+
+class _LazyBackend:
+    """Audio library imported on first use, with the outcome memoized"""
+    
+    def __init__(self, module_name: str, probe_fn=None):
+        self.module_name = module_name
+        self.probe_fn = probe_fn
+        self.module = None
+        self.available: Optional[bool] = None
+        self._lock = threading.Lock()
+    
+    def installed(self) -> bool:
+        """Whether the module can be found, without importing it"""
+        if self.available is not None:
+            return self.available
+        return _module_installed(self.module_name)
+    
+    def load(self) -> bool:
+        """Import and probe the module once; return whether it is usable"""
+        if self.available is None:
+            with self._lock:
+                if self.available is None:
+                    try:
+                        module = importlib.import_module(self.module_name)
+                        if self.probe_fn:
+                            self.probe_fn(module)
+                        self.module = module
+                        self.available = True
+                        logger.info("%s available", self.module_name)
+                    except Exception as e:
+                        self.available = False
+                        logger.warning("%s not available: %s", self.module_name, e)
+        return self.available
+
+
+@dataclass
+class _Strategy:
+    """One playback method: the backends it needs and the function that plays"""
+    name: str
+    needs: Tuple[_LazyBackend, ...]
+    play: Callable[[Path, Dict[str, Any]], Dict[str, Any]]
+    error_re: Optional[re.Pattern] = _MCI_ERROR_RE
+    
+    def available(self) -> bool:
+        return all(backend.load() for backend in self.needs)
+
+
+@dataclass
+class _AudioEntry:
+    """One audio file found in the output directory"""
+    __slots__ = ("name", "ext", "path", "size", "mtime", "mtime_ns")
+    name: str
+    ext: str
+    path: str
+    size: int
+    mtime: float
+    mtime_ns: int
+    
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "filename": self.name,
+            "size_kb": _size_kb(self.size),
+            "format": "." + self.ext,
+            "full_path": self.path,
+            "modified_time": self.mtime
+        }
+
+
 class PurePythonAudioHandler:
     """Handle audio file operations using only cross-platform Python libraries with Windows-specific optimizations"""
     
-    def __init__(self, output_dir: str = "./output"):
+    def __init__(self, output_dir: str = "./output", probe_on_init: bool = False,
+                 mixer_buffer: int = PYGAME_MIXER_BUFFER):
+        """
+        Args:
+            output_dir: Directory holding generated audio files
+            probe_on_init: Eagerly import every backend and run the Windows
+                device/driver probes. By default nothing is probed up front;
+                each backend is imported only when playback first tries it.
+            mixer_buffer: pygame mixer buffer in samples; raise it if playback
+                crackles on slow hardware
+        """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
-        self.is_windows = platform.system() == "Windows"
-        self._audio_libraries = self._detect_available_libraries()
-        self._windows_audio_devices = self._detect_windows_audio_devices() if self.is_windows else {}
-        self._windows_driver_status = self._check_windows_audio_drivers() if self.is_windows else {}
+        self.output_dir_str = str(self.output_dir.absolute())
+        self._output_root = self.output_dir.resolve()
+        self.is_windows = _IS_WINDOWS
+        self.probe_on_init = probe_on_init
+        self.mixer_buffer = mixer_buffer
+        if self.is_windows:
+            _start_device_change_listener()
+        self._backends = {
+            "pygame": _LazyBackend("pygame", self._probe_pygame),
+            "sounddevice": _LazyBackend("sounddevice", self._probe_sounddevice),
+            "pydub": _LazyBackend("pydub", self._probe_pydub),
+            "simpleaudio": _LazyBackend("simpleaudio"),
+            "soundfile": _LazyBackend("soundfile"),
+        }
+        # Ordered by first-sound latency; reordered most-recently-successful first
+        self._strategies: List[_Strategy] = [
+            _Strategy("sounddevice", (self._backends["sounddevice"],), self._play_sounddevice,
+                     _error_keyword_re("263", "MCI", "device")),
+            _Strategy("pygame", (self._backends["pygame"],), self._play_pygame,
+                     _error_keyword_re("263", "MCI", "mixer")),
+            _Strategy("simpleaudio", (self._backends["simpleaudio"],), self._play_simpleaudio, None),
+            _Strategy("pydub", (self._backends["pydub"],), self._play_pydub),
+        ]
+        # play_audio_file runs on several threads at once; the list is only
+        # ever replaced whole, under this lock, and iterated from a snapshot
+        self._strategies_lock = threading.Lock()
+        self._windows_audio_devices = {}
+        self._windows_driver_status = {}
+        self._info_cache: Dict[tuple, Dict[str, Any]] = {}
+        # Preloaded WAV images for PlaySound, and the one currently playing
+        self._winsound_buffers: Dict[tuple, Any] = {}
+        self._winsound_playing = None
+        # Header-only metadata reader per extension; anything else goes to soundfile
+        self._info_readers: Dict[str, Callable[[Path, _FastStat], Dict[str, Any]]] = {
+            ".wav": self._info_wav,
+            ".flac": self._info_soundfile,
+            ".ogg": self._info_soundfile,
+            ".mp3": self._info_mp3,
+            ".m4a": self._info_ffprobe,
+            ".aac": self._info_ffprobe,
+        }
+        # Last output_dir listing, valid while neither the directory nor any
+        # listed file has changed
+        self._list_cache: Optional[Dict[str, Any]] = None
+        self._list_cache_dir_mtime = 0
+        self._file_meta_cache: Dict[str, _AudioEntry] = {}
+        # Single persistent playback worker, started on first play
+        self._play_q: queue.Queue = queue.Queue()
+        self._play_lock = threading.Lock()
+        self._play_pending = 0  # queued or running jobs, guarded by _play_lock
+        self._play_thread: Optional[threading.Thread] = None
+        # Completion futures by playback id; the id of the job a play call
+        # queued is handed to _playback_started through thread-local state
+        self._playbacks: Dict[str, Future] = {}
+        self._playback_ctx = threading.local()
+        if self.is_windows:
+            # Defaults used when probing is skipped; winsound ships with CPython
+            self._windows_audio_devices = {
+                "default_device": None,
+                "available_devices": [],
+                "mci_compatible": False,
+                "winsound_available": _module_installed("winsound")
+            }
+        
+        logger.info("Platform: %s", _SYSTEM)
+        logger.info("Configured audio libraries: %s", list(self._backends))
         
-        logger.info(f"Platform: {platform.system()}")
-        logger.info(f"Available audio libraries: {list(self._audio_libraries.keys())}")
+        if not probe_on_init:
+            return
+        
+        for backend in self._backends.values():
+            backend.load()
+        if self._backends["pygame"].available:
+            # Open the mixer now so the first pygame playback doesn't pay for it
+            try:
+                _ensure_pygame_mixer(self.mixer_buffer)
+            except Exception as e:
+                logger.warning("pygame mixer could not be opened: %s", e)
         
         if self.is_windows:
-            logger.info(f"Windows audio devices detected: {len(self._windows_audio_devices)}")
-            if self._windows_driver_status.get("compatible", False):
-                logger.info("✅ Windows audio drivers are compatible")
-            else:
-                logger.warning("⚠️ Windows audio driver issues detected")
+            # Device and driver probes are independent I/O (PortAudio, SCM, COM),
+            # so run them concurrently.
+            with ThreadPoolExecutor(max_workers=2, thread_name_prefix="audio-probe") as ex:
+                devices_future = ex.submit(self._detect_windows_audio_devices)
+                drivers_future = ex.submit(self._check_windows_audio_drivers)
+                self._windows_audio_devices = devices_future.result()
+                self._windows_driver_status = drivers_future.result()
+            
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Windows audio devices detected: %s", len(self._windows_audio_devices))
+                if self._windows_driver_status.get("compatible", False):
+                    logger.info("Windows audio drivers are compatible")
+            if not self._windows_driver_status.get("compatible", False):
+                logger.warning("Windows audio driver issues detected")
                 for rec in self._windows_driver_status.get("recommendations", []):
-                    logger.warning(f"💡 Recommendation: {rec}")
+                    logger.warning("Recommendation: %s", rec)
+    
+    @property
+    def _audio_libraries(self) -> Dict[str, bool]:
+        """Availability per library: the load outcome once tried, else whether it is installed"""
+        return {name: backend.installed() for name, backend in self._backends.items()}
     
     def get_available_libraries(self):
-        """Get list of available audio libraries"""
+        """Get list of audio libraries not known to be unavailable (never imports)"""
         return [lib for lib, available in self._audio_libraries.items() if available]
         
-    def _detect_windows_audio_devices(self) -> Dict[str, Any]:
-        """Detect Windows audio devices and validate MCI compatibility"""
+    def _detect_windows_audio_devices(self, include_samplerate: bool = False) -> Dict[str, Any]:
+        """Detect Windows audio devices and validate MCI compatibility
+        
+        Args:
+            include_samplerate: Also report each device's default sample rate
+        """
         if not self.is_windows:
             return {}
         
@@ -65,132 +1112,77 @@ class PurePythonAudioHandler:
             # Test winsound availability
             import winsound
             devices["winsound_available"] = True
-            logger.info("✅ winsound available (Windows native)")
+            logger.info("winsound available (Windows native)")
         except ImportError:
-            logger.warning("❌ winsound not available")
+            logger.warning("winsound not available")
         
         try:
             # Check for Windows audio devices using sounddevice
             import sounddevice as sd
-            device_list = sd.query_devices()
+            device_list = _cached_query_devices()
             for i, device in enumerate(device_list):
                 if device['max_output_channels'] > 0:
-                    devices["available_devices"].append({
+                    entry = {
                         "id": i,
                         "name": device['name'],
-                        "channels": device['max_output_channels'],
-                        "default_samplerate": device['default_samplerate']
-                    })
+                        "channels": device['max_output_channels']
+                    }
+                    if include_samplerate:
+                        entry["default_samplerate"] = device['default_samplerate']
+                    devices["available_devices"].append(entry)
             
-            # Get default output device
+            # Resolve the default output device from the list we already have
             try:
-                default_device = sd.query_devices(kind='output')
-                devices["default_device"] = default_device['name']
-                logger.info(f"✅ Default Windows audio device: {default_device['name']}")
+                default_index = sd.default.device[1]
+                if default_index is not None and 0 <= default_index < len(device_list):
+                    devices["default_device"] = device_list[default_index]['name']
+                    logger.info("Default Windows audio device: %s", devices["default_device"])
             except Exception as e:
-                logger.warning(f"⚠️ Could not get default audio device: {e}")
+                logger.warning("Could not get default audio device: %s", e)
         
         except Exception as e:
-            logger.warning(f"⚠️ Could not query Windows audio devices: {e}")
+            logger.warning("Could not query Windows audio devices: %s", e)
         
         # Test MCI compatibility
         try:
             # Try to access Windows MCI (Media Control Interface)
             winmm = ctypes.windll.winmm
             devices["mci_compatible"] = True
-            logger.info("✅ Windows MCI interface accessible")
+            logger.info("Windows MCI interface accessible")
         except Exception as e:
-            logger.warning(f"⚠️ Windows MCI interface not accessible: {e}")
+            logger.warning("Windows MCI interface not accessible: %s", e)
         
         return devices
     
-    def _detect_available_libraries(self) -> Dict[str, bool]:
-        """Detect which audio libraries are available with Windows-specific validation"""
-        libraries = {}
-        
-        # Test pygame with Windows-specific checks
-        try:
-            import pygame
-            if self.is_windows:
-                # Test pygame initialization on Windows
-                try:
-                    pygame.mixer.pre_init(frequency=44100, size=-16, channels=2, buffer=1024)
-                    pygame.mixer.init()
-                    pygame.mixer.quit()
-                    libraries['pygame'] = True
-                    logger.info("✅ pygame available and tested on Windows")
-                except Exception as e:
-                    libraries['pygame'] = False
-                    logger.warning(f"❌ pygame failed Windows test: {e}")
-            else:
-                libraries['pygame'] = True
-                logger.info("✅ pygame available")
-        except ImportError:
-            libraries['pygame'] = False
-            logger.warning("❌ pygame not available")
-        
-        # Test sounddevice with device validation
-        try:
-            import sounddevice as sd
-            import numpy as np
-            if self.is_windows:
-                # Validate Windows audio devices
-                try:
-                    devices = sd.query_devices()
-                    output_devices = [d for d in devices if d['max_output_channels'] > 0]
-                    if output_devices:
-                        libraries['sounddevice'] = True
-                        logger.info(f"✅ sounddevice available with {len(output_devices)} output devices")
-                    else:
-                        libraries['sounddevice'] = False
-                        logger.warning("❌ sounddevice: no output devices found")
-                except Exception as e:
-                    libraries['sounddevice'] = False
-                    logger.warning(f"❌ sounddevice device validation failed: {e}")
-            else:
-                libraries['sounddevice'] = True
-                logger.info("✅ sounddevice available")
-        except ImportError:
-            libraries['sounddevice'] = False
-            logger.warning("❌ sounddevice not available")
-        
-        # Test pydub
-        try:
-            from pydub import AudioSegment
-            from pydub.playback import play
-            libraries['pydub'] = True
-            logger.info("✅ pydub available")
-        except ImportError:
-            libraries['pydub'] = False
-            logger.warning("❌ pydub not available")
-        
-        # Test simpleaudio with Windows validation
-        try:
-            import simpleaudio as sa
-            if self.is_windows:
-                # Test simpleaudio on Windows
-                try:
-                    # Try to create a simple wave object to test functionality
-                    test_data = b'\x00\x00' * 1000  # Simple silence
-                    libraries['simpleaudio'] = True
-                    logger.info("✅ simpleaudio available and tested on Windows")
-                except Exception as e:
-                    libraries['simpleaudio'] = False
-                    logger.warning(f"❌ simpleaudio failed Windows test: {e}")
-            else:
-                libraries['simpleaudio'] = True
-                logger.info("✅ simpleaudio available")
-        except ImportError:
-            libraries['simpleaudio'] = False
-            logger.warning("❌ simpleaudio not available")
-        
-        return libraries
+    def _probe_pygame(self, pygame) -> None:
+        """Verify pygame was built with its mixer (the device is opened on first play)"""
+        if pygame.mixer is None:
+            raise RuntimeError("pygame.mixer is unavailable")
+    
+    def _probe_sounddevice(self, sd) -> None:
+        """Verify numpy is present and, on Windows, that an output device exists"""
+        import numpy as np
+        if self.is_windows:
+            devices = _cached_query_devices()
+            output_devices = [d for d in devices if d['max_output_channels'] > 0]
+            if not output_devices:
+                raise RuntimeError("no output devices found")
+            logger.info("sounddevice has %s output devices", len(output_devices))
+    
+    def _probe_pydub(self, pydub) -> None:
+        """Verify pydub's playback helpers import"""
+        from pydub import AudioSegment
+        from pydub.playback import play
     
     def _check_windows_audio_drivers(self) -> Dict[str, Any]:
         """Check Windows audio driver compatibility and status"""
         if not self.is_windows:
             return {"compatible": True, "message": "Not Windows"}
         
+        return _enum_cache_lookup("drivers", self._query_windows_audio_drivers)
+    
+    def _query_windows_audio_drivers(self) -> Dict[str, Any]:
+        """Probe the Windows audio service and drivers (uncached)"""
         driver_status = {
             "compatible": False,
             "audio_service_running": False,
@@ -201,46 +1193,32 @@ class PurePythonAudioHandler:
         try:
             # Check if Windows Audio service is running
             try:
-                result = subprocess.run(
-                    ['sc', 'query', 'AudioSrv'], 
-                    capture_output=True, 
-                    text=True, 
-                    timeout=5
-                )
-                if "RUNNING" in result.stdout:
+                if _query_audio_service_running():
                     driver_status["audio_service_running"] = True
-                    logger.info("✅ Windows Audio service is running")
+                    logger.info("Windows Audio service is running")
                 else:
-                    logger.warning("⚠️ Windows Audio service is not running")
+                    logger.warning("Windows Audio service is not running")
                     driver_status["recommendations"].append("Start Windows Audio service")
             except Exception as e:
-                logger.warning(f"⚠️ Could not check Windows Audio service: {e}")
+                logger.warning("Could not check Windows Audio service: %s", e)
             
-            # Check for audio drivers using WMI (if available)
+            # Enumerate active playback endpoints through the Core Audio API,
+            # falling back to a CIM query if COM is unavailable
             try:
-                result = subprocess.run(
-                    ['wmic', 'sounddev', 'get', 'name,status'], 
-                    capture_output=True, 
-                    text=True, 
-                    timeout=10
-                )
-                if result.returncode == 0 and result.stdout:
-                    lines = result.stdout.strip().split('\n')
-                    for line in lines[1:]:  # Skip header
-                        if line.strip() and 'OK' in line:
-                            driver_name = line.replace('OK', '').strip()
-                            if driver_name:
-                                driver_status["drivers_detected"].append(driver_name)
+                try:
+                    driver_status["drivers_detected"] = _enumerate_audio_endpoints()
+                except OSError as com_error:
+                    logger.info("Core Audio enumeration failed (%s), querying CIM", com_error)
+                    driver_status["drivers_detected"] = _query_sound_devices_cim()
+                if driver_status["drivers_detected"]:
+                    logger.info("Found %s working audio drivers", len(driver_status['drivers_detected']))
+                    driver_status["compatible"] = True
+                else:
+                    logger.warning("No working audio drivers detected")
+                    driver_status["recommendations"].append("Update or reinstall audio drivers")
                     
-                    if driver_status["drivers_detected"]:
-                        logger.info(f"✅ Found {len(driver_status['drivers_detected'])} working audio drivers")
-                        driver_status["compatible"] = True
-                    else:
-                        logger.warning("⚠️ No working audio drivers detected")
-                        driver_status["recommendations"].append("Update or reinstall audio drivers")
-                        
             except Exception as e:
-                logger.warning(f"⚠️ Could not check audio drivers via WMI: {e}")
+                logger.warning("Could not enumerate audio endpoints: %s", e)
                 driver_status["recommendations"].append("Check audio drivers manually in Device Manager")
             
             # Test basic Windows audio functionality
@@ -248,10 +1226,10 @@ class PurePythonAudioHandler:
                 import winsound
                 # Try to play a system sound (non-blocking test)
                 winsound.MessageBeep(winsound.MB_OK)
-                logger.info("✅ Windows system audio test successful")
+                logger.info("Windows system audio test successful")
                 driver_status["compatible"] = True
             except Exception as e:
-                logger.warning(f"⚠️ Windows system audio test failed: {e}")
+                logger.warning("Windows system audio test failed: %s", e)
                 driver_status["recommendations"].append("Check Windows audio configuration")
             
             # Final compatibility assessment
@@ -259,55 +1237,17 @@ class PurePythonAudioHandler:
                 driver_status["compatible"] = True
             
         except Exception as e:
-            logger.error(f"❌ Windows audio driver check failed: {e}")
+            logger.error("Windows audio driver check failed: %s", e)
             driver_status["recommendations"].append("Manual audio system check required")
         
         return driver_status
     
-    def _verify_audio_format(self, file_path: Path) -> Dict[str, Any]:
+    def _verify_audio_format(self, file_path: Path, stat: Optional[_FastStat] = None) -> Dict[str, Any]:
         """Verify and validate audio file format for Windows compatibility"""
         try:
-            format_info = {
-                "valid": False,
-                "format": file_path.suffix.lower(),
-                "size_bytes": file_path.stat().st_size,
-                "recommendations": []
-            }
-            
-            # Check file extension
-            supported_formats = {".wav", ".mp3", ".ogg", ".m4a", ".flac"}
-            if format_info["format"] not in supported_formats:
-                format_info["recommendations"].append(f"Unsupported format {format_info['format']}. Convert to WAV for best compatibility.")
-                return format_info
-            
-            # Check file size (empty files cause issues)
-            if format_info["size_bytes"] < 100:
-                format_info["recommendations"].append("File too small, may be corrupted or empty.")
-                return format_info
-            
-            # Try to read file header for additional validation
-            try:
-                with open(file_path, 'rb') as f:
-                    header = f.read(12)
-                    
-                if format_info["format"] == ".wav":
-                    if header[:4] == b'RIFF' and header[8:12] == b'WAVE':
-                        format_info["valid"] = True
-                    else:
-                        format_info["recommendations"].append("Invalid WAV file header.")
-                elif format_info["format"] == ".mp3":
-                    if header[:3] == b'ID3' or header[:2] == b'\xff\xfb':
-                        format_info["valid"] = True
-                    else:
-                        format_info["recommendations"].append("Invalid MP3 file header.")
-                else:
-                    # For other formats, assume valid if we got this far
-                    format_info["valid"] = True
-                    
-            except Exception as e:
-                format_info["recommendations"].append(f"Could not read file header: {e}")
-                
-            return format_info
+            if stat is None:
+                stat = _fast_stat(file_path)
+            return _format_info_cached(str(file_path), stat.st_mtime_ns, stat.st_size)
             
         except Exception as e:
             return {
@@ -318,47 +1258,16 @@ class PurePythonAudioHandler:
     
     def _handle_windows_mci_error(self, error_msg: str) -> Dict[str, Any]:
         """Handle Windows MCI (Media Control Interface) errors"""
-        mci_solutions = {
-            "263": {
-                "description": "The specified device is not open or is not recognized by MCI",
-                "solutions": [
-                    "Update audio drivers",
-                    "Try running as administrator",
-                    "Use alternative audio library (sounddevice/pygame)",
-                    "Check Windows audio service is running"
-                ]
-            },
-            "259": {
-                "description": "The driver cannot recognize the specified command parameter",
-                "solutions": [
-                    "Convert audio to WAV format",
-                    "Check audio file is not corrupted",
-                    "Try different audio library"
-                ]
-            },
-            "277": {
-                "description": "The file format is invalid",
-                "solutions": [
-                    "Convert to WAV format",
-                    "Check file is not corrupted",
-                    "Use pydub for format conversion"
-                ]
-            }
-        }
-        
         # Extract error code from message
-        error_code = None
-        for code in mci_solutions.keys():
-            if code in error_msg:
-                error_code = code
-                break
+        match = _MCI_RE.search(error_msg)
+        error_code = match.group(1) if match else None
         
         if error_code:
             return {
                 "error_type": "MCI Error",
                 "error_code": error_code,
-                "description": mci_solutions[error_code]["description"],
-                "solutions": mci_solutions[error_code]["solutions"]
+                "description": MCI_SOLUTIONS[error_code]["description"],
+                "solutions": MCI_SOLUTIONS[error_code]["solutions"]
             }
         else:
             return {
@@ -371,15 +1280,13 @@ class PurePythonAudioHandler:
                 ]
             }
     
-    def _windows_winsound_fallback(self, file_path: Path) -> Dict[str, Any]:
-        """Emergency Windows fallback using winsound"""
+    def _play_winsound(self, file_path: Path, stat: Optional[_FastStat] = None) -> Dict[str, Any]:
+        """Hand a WAV file to the OS with PlaySound from a preloaded buffer (no decode)"""
         if not self.is_windows:
             return {"success": False, "error": "winsound only available on Windows"}
         
         try:
-            import winsound
-            
-            # Only WAV files are supported by winsound
+            # Only WAV files are supported by PlaySound
             if file_path.suffix.lower() != ".wav":
                 return {
                     "success": False,
@@ -387,48 +1294,487 @@ class PurePythonAudioHandler:
                     "recommendation": "Convert to WAV format first"
                 }
             
-            def winsound_play():
+            if stat is None:
+                stat = _fast_stat(file_path)
+            buffer = self._winsound_buffer(file_path, stat)
+            duration = _wav_duration(_parse_wav_header(buffer[:WAV_HEADER_READ]) or {}, len(buffer))
+            play_sound = ctypes.windll.winmm.PlaySoundW
+            play_sound.argtypes = [ctypes.c_void_p, wintypes.HMODULE, wintypes.DWORD]
+            play_sound.restype = wintypes.BOOL
+            
+            def start():
+                # winsound.PlaySound refuses SND_MEMORY with SND_ASYNC, so call
+                # winmm directly. The buffer must outlive the sound: keep it
+                # referenced until the next PlaySound call replaces the sound.
+                if not play_sound(ctypes.addressof(buffer), None, SND_MEMORY | SND_ASYNC | SND_NODEFAULT):
+                    raise RuntimeError("PlaySound failed to start")
+                self._winsound_playing = buffer
+            
+            def wait(_):
+                # PlaySound reports no completion, so hold the worker for the
+                # clip's length; SND_ASYNC would otherwise cut it off with the
+                # next sound, and the playback stays busy until it really ends
+                time.sleep(duration)
+            
+            self._start_playback("winsound", file_path, start, wait)
+            
+            return self._playback_started("winsound", file_path)
+            
+        except Exception as e:
+            return {"success": False, "error": f"winsound error: {e}"}
+    
+    def _winsound_buffer(self, file_path: Path, stat: _FastStat):
+        """WAV bytes in a ctypes buffer, cached per file version for repeat plays"""
+        cache_key = (str(file_path), stat.st_mtime_ns, stat.st_size)
+        buffer = self._winsound_buffers.get(cache_key)
+        if buffer is None:
+            buffer = (ctypes.c_char * stat.st_size)()
+            with open(file_path, 'rb') as f:
+                f.readinto(buffer)
+            if len(self._winsound_buffers) >= WINSOUND_BUFFER_CACHE_SIZE:
+                self._winsound_buffers.pop(next(iter(self._winsound_buffers)))
+            self._winsound_buffers[cache_key] = buffer
+        return buffer
+    
+    def _playback_started(self, method: str, file_path: Path, **details) -> Dict[str, Any]:
+        """Log and build the success result shared by every playback method"""
+        name = file_path.name
+        logger.info("%s playback started: %s", method, name)
+        playback_id = vars(self._playback_ctx).pop("playback_id", None)
+        if playback_id is not None:
+            details["playback_id"] = playback_id
+        return {
+            "success": True,
+            "message": f"Playing audio file with {method}: {name}",
+            "method": method,
+            "file_path": os.fspath(file_path),
+            **details
+        }
+    
+    def _start_playback(self, method: str, file_path: Path, start, wait=None) -> None:
+        """Queue a backend's start/wait pair on the playback worker
+        
+        When nothing is playing, returns as soon as `start` has handed the audio
+        to the backend and re-raises anything it raised, so the caller can fall
+        through to the next method. Behind another playback, or once
+        PLAYBACK_START_TIMEOUT has passed, this returns without the outcome and
+        the worker logs a failed start instead.
+        """
+        started = threading.Event()
+        start_error: List[Exception] = []
+        done: Future = Future()
+        playback_id = uuid.uuid4().hex[:12]
+        with self._play_lock:
+            if len(self._playbacks) >= PLAYBACK_HISTORY:
+                for old_id in [k for k, f in self._playbacks.items() if f.done()]:
+                    del self._playbacks[old_id]
+            self._playbacks[playback_id] = done
+        self._playback_ctx.playback_id = playback_id
+        
+        self._ensure_playback_worker()
+        # Idle check and enqueue are one step, so concurrent callers can't both
+        # see an idle worker. caller_waiting[0] is cleared, under the same
+        # lock, when this call stops waiting for the start outcome.
+        with self._play_lock:
+            idle = self._play_pending == 0
+            self._play_pending += 1
+            caller_waiting = [idle]
+            self._play_q.put((method, file_path, start, wait, started, start_error, caller_waiting, done))
+        
+        if not idle:
+            logger.info("%s playback queued: %s", method, file_path.name)
+            return
+        confirmed = started.wait(timeout=PLAYBACK_START_TIMEOUT)
+        with self._play_lock:
+            caller_waiting[0] = False
+            error = start_error[0] if start_error else None
+        if error is not None:
+            del self._playback_ctx.playback_id
+            raise error
+        if not confirmed:
+            logger.warning("%s has not confirmed playback start yet: %s", method, file_path.name)
+    
+    def _ensure_playback_worker(self) -> None:
+        with self._play_lock:
+            if self._play_thread is None:
+                self._play_thread = threading.Thread(
+                    target=self._playback_worker, name="audio-playback", daemon=True
+                )
+                self._play_thread.start()
+    
+    def _playback_worker(self) -> None:
+        """Run queued playbacks one at a time on a single persistent thread"""
+        if self.is_windows:
+            _join_mmcss_pro_audio()
+        while True:
+            method, file_path, start, wait, started, start_error, caller_waiting, done = self._play_q.get()
+            try:
                 try:
-                    winsound.PlaySound(str(file_path), winsound.SND_FILENAME | winsound.SND_ASYNC)
-                    logger.info(f"✅ winsound playback started: {file_path.name}")
+                    handle = start()
                 except Exception as e:
-                    logger.error(f"❌ winsound playback error: {e}")
+                    # Handed to the caller if it is still waiting, else logged
+                    with self._play_lock:
+                        start_error.append(e)
+                        report = not caller_waiting[0]
+                    done.set_exception(e)
+                    if report:
+                        logger.error("%s playback failed to start: %s", method, e)
+                    continue
+                finally:
+                    started.set()
+                
+                if wait is not None:
+                    wait(handle)
+                    logger.info("%s playback completed: %s", method, file_path.name)
+                done.set_result(None)
+            except Exception as e:
+                logger.error("%s playback error: %s", method, e)
+                done.set_exception(e)
+            finally:
+                with self._play_lock:
+                    self._play_pending -= 1
+    
+    def _to_float32(self, audio_data):
+        """Cast and scale PCM samples to float32 in a single pass
+
+        Each call gets its own output array: stream callbacks, rtmixer and
+        sd.play keep reading it after this returns.
+        """
+        import numpy as np
+        if audio_data.dtype == np.float32:
+            return audio_data
+        
+        out = np.empty(audio_data.shape, np.float32)
+        
+        scale = _PCM_FLOAT_SCALE.get(audio_data.dtype.name)
+        if scale is None:
+            np.copyto(out, audio_data, casting='unsafe')
+        elif scale[0]:
+            np.copyto(out, audio_data, casting='unsafe')
+            np.subtract(out, np.float32(scale[0]), out=out)
+            np.multiply(out, np.float32(scale[1]), out=out)
+        else:
+            np.multiply(audio_data, np.float32(scale[1]), out=out, casting='unsafe')
+        return out
+    
+    def _stream_with_soundfile(self, sd, sf, file_path: Path) -> Dict[str, Any]:
+        """Play a file through an OutputStream fed block-by-block from disk
+        
+        Memory stays at a few prefetched blocks regardless of file length, and
+        the stream is running once the playback worker confirms the start.
+        """
+        sound_file = sf.SoundFile(str(file_path))
+        if sound_file.frames == 0:
+            sound_file.close()
+            raise ValueError("audio file contains no frames")
+        sample_rate = sound_file.samplerate
+        duration = sound_file.frames / sample_rate
+        blocks = queue.Queue(maxsize=STREAM_PREFETCH_BLOCKS)
+        finished = threading.Event()
+        
+        def read_block():
+            data = sound_file.read(STREAM_BLOCKSIZE, dtype='float32', always_2d=True)
+            return data if len(data) else None
+        
+        def callback(outdata, frames, time_info, status):
+            try:
+                data = blocks.get_nowait()
+            except queue.Empty:
+                outdata.fill(0)  # reader fell behind; emit silence
+                return
+            if data is None:
+                outdata.fill(0)
+                raise sd.CallbackStop
+            outdata[:len(data)] = data
+            if len(data) < frames:
+                outdata[len(data):] = 0
+                raise sd.CallbackStop
+        
+        def stream_start():
+            try:
+                # Prefill so the first callbacks never underrun
+                exhausted = False
+                while not blocks.full():
+                    data = read_block()
+                    if data is None:
+                        exhausted = True
+                        break
+                    blocks.put_nowait(data)
+                if exhausted:
+                    blocks.put(None)
+                
+                stream = sd.OutputStream(
+                    samplerate=sample_rate,
+                    channels=sound_file.channels,
+                    dtype='float32',
+                    blocksize=STREAM_BLOCKSIZE,
+                    callback=callback,
+                    finished_callback=finished.set
+                )
+                try:
+                    stream.start()
+                except Exception:
+                    stream.close()
+                    raise
+                return stream, exhausted
+            except Exception:
+                sound_file.close()
+                raise
+        
+        def stream_feed(handle):
+            stream, exhausted = handle
+            try:
+                if not exhausted:
+                    while True:
+                        data = read_block()
+                        blocks.put(data)
+                        if data is None:
+                            break
+                finished.wait()
+            finally:
+                stream.close()
+                sound_file.close()
+        
+        self._start_playback("sounddevice", file_path, stream_start, stream_feed)
+        
+        return self._playback_started("sounddevice", file_path, sample_rate=int(sample_rate), duration_seconds=duration)
+    
+    def _play_buffer_stream(self, sd, file_path: Path, audio_data, sample_rate: int,
+                            convert=None, channels: Optional[int] = None, dtype: Optional[str] = None) -> None:
+        """Play an in-memory sample array through a low-latency OutputStream
+        
+        The callback copies consecutive slices of `audio_data` straight into
+        the device buffer; the stream is running once the worker confirms the
+        start, and the worker then only waits for the finished callback.
+        With `convert`, each slice is converted to `channels` x `dtype` samples
+        as it is played instead of converting the whole array up front.
+        """
+        frames_2d = audio_data.reshape(len(audio_data), -1)
+        channels = channels or frames_2d.shape[1]
+        dtype = dtype or audio_data.dtype.name
+        silence = 128 if dtype == "uint8" else 0
+        finished = threading.Event()
+        position = 0
+        
+        def callback(outdata, frames, time_info, status):
+            nonlocal position
+            chunk = frames_2d[position:position + frames]
+            if convert is not None:
+                chunk = convert(chunk, channels)
+            n = len(chunk)
+            outdata[:n] = chunk
+            position += n
+            if n < frames:
+                outdata[n:] = silence
+                raise sd.CallbackStop
+        
+        def stream_start():
+            stream = sd.OutputStream(
+                samplerate=sample_rate,
+                channels=channels,
+                dtype=dtype,
+                blocksize=LOW_LATENCY_BLOCKSIZE,
+                latency='low',
+                callback=callback,
+                finished_callback=finished.set
+            )
+            try:
+                stream.start()
+            except Exception:
+                stream.close()
+                raise
+            return stream
+        
+        def stream_wait(stream):
+            try:
+                finished.wait()
+            finally:
+                stream.close()
+        
+        self._start_playback("sounddevice", file_path, stream_start, stream_wait)
+    
+    def _play_sounddevice(self, file_path: Path, fmt: Dict[str, Any]) -> Dict[str, Any]:
+        """sounddevice + numpy (most reliable for cross-platform)"""
+        sd = self._backends["sounddevice"].module
+        
+        # Map the WAV directly for plain PCM; libsndfile streams everything
+        # else from disk, and scipy is the last resort without it
+        wav = _map_wav_samples(file_path, fmt) if "data_offset" in fmt else None
+        if wav is not None:
+            sample_rate, audio_data, _ = wav
+        elif "data_offset" in fmt and (fmt["format_tag"], fmt["bits_per_sample"]) == (WAVE_FORMAT_PCM, 24):
+            # 24-bit PCM: map the bytes and widen each block to int32 as it plays,
+            # rather than decoding the whole file before the first sample
+            sample_rate, raw, channels = _map_wav_pcm24(file_path, fmt)
+            self._play_buffer_stream(sd, file_path, raw, sample_rate,
+                                     convert=_pcm24_to_int32, channels=channels, dtype="int32")
+            return self._playback_started("sounddevice", file_path, sample_rate=int(sample_rate),
+                                          duration_seconds=len(raw) / sample_rate)
+        elif self._backends["soundfile"].load():
+            return self._stream_with_soundfile(sd, self._backends["soundfile"].module, file_path)
+        else:
+            from scipy.io import wavfile
+            sample_rate, audio_data = wavfile.read(str(file_path))
+        
+        # PortAudio plays 8/16/32-bit integer and float32 PCM natively, so the
+        # mapped samples go to the device as-is (no float copy, half the bytes
+        # for int16); anything else is converted once
+        if audio_data.dtype.name not in SD_NATIVE_DTYPES:
+            audio_data = self._to_float32(audio_data)
+        
+        try:
+            import rtmixer
+        except ImportError:
+            rtmixer = None
+        
+        if rtmixer is not None:
+            # rtmixer's callback is C code that never takes the GIL, so a busy
+            # interpreter (GC, other tool calls) can't cause dropouts
+            channels = audio_data.shape[1] if audio_data.ndim > 1 else 1
             
-            thread = threading.Thread(target=winsound_play, daemon=True)
-            thread.start()
-            time.sleep(0.1)  # Brief pause to ensure playback starts
+            def rtmixer_start():
+                mixer = rtmixer.Mixer(channels=channels, samplerate=sample_rate, dtype=audio_data.dtype.name)
+                try:
+                    mixer.start()
+                    return mixer, mixer.play_buffer(audio_data, channels=channels)
+                except Exception:
+                    mixer.close()
+                    raise
             
-            return {
-                "success": True,
-                "message": f"Playing with Windows winsound (emergency fallback): {file_path.name}",
-                "method": "winsound",
-                "file_path": str(file_path.absolute())
-            }
+            def rtmixer_wait(handle):
+                mixer, action = handle
+                try:
+                    mixer.wait(action)
+                finally:
+                    mixer.close()
             
-        except ImportError:
-            return {"success": False, "error": "winsound not available"}
+            self._start_playback("sounddevice", file_path, rtmixer_start, rtmixer_wait)
+        else:
+            self._play_buffer_stream(sd, file_path, audio_data, sample_rate)
+        
+        return self._playback_started("sounddevice", file_path, sample_rate=int(sample_rate), duration_seconds=len(audio_data) / sample_rate)
+    
+    def _play_pygame(self, file_path: Path, fmt: Dict[str, Any]) -> Dict[str, Any]:
+        """pygame (reliable and cross-platform)"""
+        # Initialize pygame mixer if not already done
+        music = _ensure_pygame_mixer(self.mixer_buffer).music
+        
+        # Clamped to the file: a streamed placeholder size would otherwise
+        # park the worker for hours
+        duration = _wav_duration(fmt, fmt.get("size_bytes", 0))
+        
+        def pygame_start():
+            music.load(str(file_path))
+            music.set_volume(1.0)
+            music.play()
+        
+        def pygame_wait(_):
+            # No display is ever initialized, so there is no end-of-music
+            # event: sleep through the known length and only poll the tail
+            if duration > PYGAME_POLL_INTERVAL:
+                time.sleep(duration - PYGAME_POLL_INTERVAL)
+            while music.get_busy():
+                time.sleep(PYGAME_POLL_INTERVAL)
+        
+        self._start_playback("pygame", file_path, pygame_start, pygame_wait)
+        
+        return self._playback_started("pygame", file_path)
+    
+    def _play_simpleaudio(self, file_path: Path, fmt: Dict[str, Any]) -> Dict[str, Any]:
+        """simpleaudio (lightweight and reliable)"""
+        sa = self._backends["simpleaudio"].module
+        
+        self._start_playback(
+            "simpleaudio", file_path,
+            lambda: sa.WaveObject.from_wave_file(str(file_path)).play(),
+            lambda play_obj: play_obj.wait_done()  # Wait until playback is finished
+        )
+        
+        return self._playback_started("simpleaudio", file_path)
+    
+    def _play_pydub(self, file_path: Path, fmt: Dict[str, Any]) -> Dict[str, Any]:
+        """pydub (with fallback playback)"""
+        AudioSegment = self._backends["pydub"].module.AudioSegment
+        
+        if self._backends['sounddevice'].load():
+            # Decode with pydub (for formats the other paths can't read), but apply
+            # the gain with numpy and play through sounddevice instead of pydub's
+            # per-sample gain and re-export round-trip
+            import numpy as np
+            sd = self._backends["sounddevice"].module
+            
+            def pydub_start():
+                audio = AudioSegment.from_file(str(file_path))
+                width, channels = audio.sample_width, audio.channels
+                if width == 3:
+                    # Packed 24-bit, widened like the sounddevice pcm24 path
+                    raw = np.frombuffer(audio.raw_data, dtype=np.uint8).reshape(-1, channels * 3)
+                    samples = _pcm24_to_int32(raw, channels)
+                else:
+                    # pydub re-biases 8-bit WAV data to signed on load
+                    dtype = {1: np.int8, 2: np.int16, 4: np.int32}.get(width)
+                    if dtype is None:
+                        raise ValueError(f"unsupported sample width: {width}")
+                    samples = np.frombuffer(audio.raw_data, dtype=dtype)
+                    if channels > 1:
+                        samples = samples.reshape(-1, channels)
+                audio_data = self._to_float32(samples)
+                # Boost volume slightly for better audibility
+                np.multiply(audio_data, np.float32(PYDUB_GAIN), out=audio_data)
+                np.clip(audio_data, -1.0, 1.0, out=audio_data)
+                sd.play(audio_data, audio.frame_rate)
+            
+            self._start_playback("pydub", file_path, pydub_start, lambda _: sd.wait())
+        else:
+            def pydub_decode():
+                audio = AudioSegment.from_file(str(file_path))
+                # Boost volume slightly for better audibility
+                return audio + PYDUB_GAIN_DB
+            
+            self._start_playback("pydub", file_path, pydub_decode, self._backends["pydub"].module.playback.play)
+        
+        return self._playback_started("pydub", file_path)
+    
+    def playback_future(self, playback_id: str) -> Optional[Future]:
+        """Future resolved when a playback finishes, for callers that must not block"""
+        return self._playbacks.get(playback_id)
+    
+    def wait_for_playback(self, playback_id: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Block until a playback returned by play_audio_file has finished"""
+        future = self._playbacks.get(playback_id)
+        if future is None:
+            return {"success": False, "error": f"Unknown playback id: {playback_id}"}
+        try:
+            future.result(timeout=timeout)
+        except FuturesTimeoutError:
+            return {"success": True, "playback_id": playback_id, "completed": False}
         except Exception as e:
-            return {"success": False, "error": f"winsound error: {e}"}
+            return {"success": False, "playback_id": playback_id, "error": str(e)}
+        return {"success": True, "playback_id": playback_id, "completed": True}
     
     def play_audio_file(self, file_path: str) -> Dict[str, Any]:
         """Play audio file using pure Python libraries with Windows-specific optimizations"""
         try:
-            file_path = Path(file_path)
-            if not file_path.exists():
+            # Resolved once here; the backends report this path as-is
+            file_path = Path(_abs_str(os.fspath(file_path)))
+            try:
+                stat = _fast_stat(file_path)
+            except FileNotFoundError:
                 return {"success": False, "error": f"File not found: {file_path}"}
             
-            logger.info(f"🔊 Attempting to play: {file_path.name}")
+            logger.info("Attempting to play: %s", file_path.name)
+            
+            # Verify audio format (cached per file version); the parsed header
+            # is handed to the backends so they don't read it again
+            fmt = self._verify_audio_format(file_path, stat)
+            if not fmt["valid"]:
+                logger.warning("Audio format validation failed: %s", fmt.get('recommendations', []))
+                # Continue anyway, but log the warning
             
             # Windows-specific pre-flight checks
             if self.is_windows:
-                # Verify audio format
-                format_check = self._verify_audio_format(file_path)
-                if not format_check["valid"]:
-                    logger.warning(f"⚠️ Audio format validation failed: {format_check.get('recommendations', [])}")
-                    # Continue anyway, but log the warning
-                
-                # Check if we have any working audio devices
-                if not self._windows_audio_devices.get("available_devices") and not self._windows_audio_devices.get("winsound_available"):
+                # Check if we have any working audio devices (only known when probed)
+                if self.probe_on_init and not self._windows_audio_devices.get("available_devices") and not self._windows_audio_devices.get("winsound_available"):
                     return {
                         "success": False,
                         "error": "No Windows audio devices detected",
@@ -439,202 +1785,50 @@ class PurePythonAudioHandler:
                         ]
                     }
             
-            # Method 1: sounddevice + numpy (most reliable for cross-platform)
-            if self._audio_libraries.get('sounddevice', False):
-                try:
-                    import sounddevice as sd
-                    import numpy as np
-                    from scipy.io import wavfile
-                    
-                    # Read WAV file
-                    sample_rate, audio_data = wavfile.read(str(file_path))
-                    
-                    # Ensure audio data is in the right format
-                    original_dtype = audio_data.dtype
-                    if original_dtype != np.float32:
-                        if original_dtype == np.int16:
-                            audio_data = audio_data.astype(np.float32) / 32768.0
-                        elif original_dtype == np.int32:
-                            audio_data = audio_data.astype(np.float32) / 2147483648.0
-                        else:
-                            audio_data = audio_data.astype(np.float32)
-                    
-                    # Play audio in a separate thread
-                    def sounddevice_play():
-                        try:
-                            sd.play(audio_data, sample_rate)
-                            sd.wait()  # Wait until playback is finished
-                            logger.info(f"✅ sounddevice playback completed: {file_path.name}")
-                        except Exception as e:
-                            logger.error(f"❌ sounddevice playback error: {e}")
-                    
-                    thread = threading.Thread(target=sounddevice_play, daemon=True)
-                    thread.start()
-                    
-                    # Give it a moment to start
-                    time.sleep(0.2)
-                    
-                    logger.info(f"✅ sounddevice playback started: {file_path.name}")
-                    return {
-                        "success": True,
-                        "message": f"Playing audio file with sounddevice: {file_path.name}",
-                        "method": "sounddevice",
-                        "file_path": str(file_path.absolute()),
-                        "sample_rate": int(sample_rate),
-                        "duration_seconds": len(audio_data) / sample_rate
-                    }
-                    
-                except ImportError:
-                    logger.warning("⚠️ scipy not available for sounddevice, trying next method")
-                except Exception as e:
-                    error_msg = str(e)
-                    logger.error(f"❌ sounddevice error: {error_msg}")
-                    
-                    # Windows-specific error handling
-                    if self.is_windows and ("263" in error_msg or "MCI" in error_msg or "device" in error_msg.lower()):
-                        mci_info = self._handle_windows_mci_error(error_msg)
-                        logger.warning(f"🔧 Windows MCI issue detected: {mci_info['description']}")
-                        logger.info(f"💡 Suggested solutions: {mci_info['solutions']}")
-            
-            # Method 2: pygame (reliable and cross-platform)
-            if self._audio_libraries.get('pygame', False):
-                try:
-                    import pygame
-                    
-                    # Initialize pygame mixer if not already done
-                    if not pygame.mixer.get_init():
-                        pygame.mixer.pre_init(
-                            frequency=44100,
-                            size=-16,
-                            channels=2,
-                            buffer=1024
-                        )
-                        pygame.mixer.init()
-                    
-                    def pygame_play():
-                        try:
-                            pygame.mixer.music.load(str(file_path))
-                            pygame.mixer.music.set_volume(1.0)
-                            pygame.mixer.music.play()
-                            
-                            # Wait for playback to complete
-                            while pygame.mixer.music.get_busy():
-                                time.sleep(0.1)
-                            
-                            logger.info(f"✅ pygame playback completed: {file_path.name}")
-                        except Exception as e:
-                            logger.error(f"❌ pygame playback error: {e}")
-                    
-                    thread = threading.Thread(target=pygame_play, daemon=True)
-                    thread.start()
-                    
-                    # Give it a moment to start
-                    time.sleep(0.2)
-                    
-                    logger.info(f"✅ pygame playback started: {file_path.name}")
-                    return {
-                        "success": True,
-                        "message": f"Playing audio file with pygame: {file_path.name}",
-                        "method": "pygame",
-                        "file_path": str(file_path.absolute())
-                    }
-                    
-                except Exception as e:
-                    error_msg = str(e)
-                    logger.error(f"❌ pygame error: {error_msg}")
-                    
-                    # Windows-specific error handling
-                    if self.is_windows and ("263" in error_msg or "MCI" in error_msg or "mixer" in error_msg.lower()):
-                        mci_info = self._handle_windows_mci_error(error_msg)
-                        logger.warning(f"🔧 Windows audio issue detected: {mci_info['description']}")
-            
-            # Method 3: simpleaudio (lightweight and reliable)
-            if self._audio_libraries.get('simpleaudio', False):
-                try:
-                    import simpleaudio as sa
-                    
-                    def simpleaudio_play():
-                        try:
-                            wave_obj = sa.WaveObject.from_wave_file(str(file_path))
-                            play_obj = wave_obj.play()
-                            play_obj.wait_done()  # Wait until playback is finished
-                            logger.info(f"✅ simpleaudio playback completed: {file_path.name}")
-                        except Exception as e:
-                            logger.error(f"❌ simpleaudio playback error: {e}")
-                    
-                    thread = threading.Thread(target=simpleaudio_play, daemon=True)
-                    thread.start()
-                    
-                    # Give it a moment to start
-                    time.sleep(0.2)
-                    
-                    logger.info(f"✅ simpleaudio playback started: {file_path.name}")
-                    return {
-                        "success": True,
-                        "message": f"Playing audio file with simpleaudio: {file_path.name}",
-                        "method": "simpleaudio",
-                        "file_path": str(file_path.absolute())
-                    }
-                    
-                except Exception as e:
-                    logger.error(f"❌ simpleaudio error: {e}")
+            # Method 0: WAV on Windows goes straight to winsound, no decode needed
+            if self.is_windows and file_path.suffix.lower() == ".wav" and self._windows_audio_devices.get("winsound_available"):
+                winsound_result = self._play_winsound(file_path, stat)
+                if winsound_result["success"]:
+                    return winsound_result
+                logger.warning("winsound playback failed: %s", winsound_result.get('error'))
             
-            # Method 4: pydub (with fallback playback)
-            if self._audio_libraries.get('pydub', False):
+            # Try each strategy in order; the last one that worked is tried first
+            for strategy in self._strategies:
+                if not strategy.available():
+                    # Backends never become importable later; stop considering it
+                    with self._strategies_lock:
+                        self._strategies = [s for s in self._strategies if s is not strategy]
+                    continue
                 try:
-                    from pydub import AudioSegment
-                    from pydub.playback import play
-                    
-                    def pydub_play():
-                        try:
-                            audio = AudioSegment.from_file(str(file_path))
-                            # Boost volume slightly for better audibility
-                            audio = audio + 5  # +5dB
-                            play(audio)
-                            logger.info(f"✅ pydub playback completed: {file_path.name}")
-                        except Exception as e:
-                            logger.error(f"❌ pydub playback error: {e}")
-                    
-                    thread = threading.Thread(target=pydub_play, daemon=True)
-                    thread.start()
-                    
-                    # Give it a moment to start
-                    time.sleep(0.2)
-                    
-                    logger.info(f"✅ pydub playback started: {file_path.name}")
-                    return {
-                        "success": True,
-                        "message": f"Playing audio file with pydub: {file_path.name}",
-                        "method": "pydub",
-                        "file_path": str(file_path.absolute())
-                    }
-                    
+                    result = strategy.play(file_path, fmt)
+                except ImportError as e:
+                    logger.warning("%s dependencies missing (%s), trying next method", strategy.name, e)
+                    continue
                 except Exception as e:
                     error_msg = str(e)
-                    logger.error(f"❌ pydub error: {error_msg}")
+                    logger.error("%s error: %s", strategy.name, error_msg)
                     
                     # Windows-specific error handling
-                    if self.is_windows and ("263" in error_msg or "MCI" in error_msg):
+                    if self.is_windows and strategy.error_re and strategy.error_re.search(error_msg):
                         mci_info = self._handle_windows_mci_error(error_msg)
-                        logger.warning(f"🔧 Windows MCI issue detected: {mci_info['description']}")
-            
-            # Windows Emergency Fallback: winsound
-            if self.is_windows and self._windows_audio_devices.get("winsound_available", False):
-                logger.info("🆘 Trying Windows winsound emergency fallback...")
-                winsound_result = self._windows_winsound_fallback(file_path)
-                if winsound_result["success"]:
-                    return winsound_result
-                else:
-                    logger.warning(f"⚠️ winsound fallback failed: {winsound_result.get('error')}")
+                        logger.warning("Windows audio issue detected: %s", mci_info['description'])
+                        logger.info("Suggested solutions: %s", mci_info['solutions'])
+                    continue
+                
+                if result.get("success"):
+                    if not self._strategies or self._strategies[0] is not strategy:
+                        with self._strategies_lock:
+                            self._strategies = [strategy] + [s for s in self._strategies if s is not strategy]
+                    return result
             
             # If all methods fail
-            logger.error(f"❌ All audio libraries failed for: {file_path.name}")
+            logger.error("All audio libraries failed for: %s", file_path.name)
             
             # Enhanced error response with Windows-specific recommendations
             error_response = {
                 "success": False,
                 "error": "All audio playback methods failed",
-                "file_path": str(file_path.absolute()),
+                "file_path": str(file_path),
                 "available_libraries": self._audio_libraries,
                 "recommendations": [
                     "Install missing audio libraries: pip install pygame sounddevice pydub simpleaudio scipy",
@@ -646,6 +1840,11 @@ class PurePythonAudioHandler:
             # Add Windows-specific recommendations
             if self.is_windows:
                 error_response["windows_devices"] = self._windows_audio_devices
+                # The service/endpoint check runs in-process (SCM + Core Audio) and
+                # only now, when playback has actually failed and its findings matter
+                if not self._windows_driver_status:
+                    self._windows_driver_status = self._check_windows_audio_drivers()
+                error_response["windows_drivers"] = self._windows_driver_status
                 error_response["recommendations"].extend([
                     "Try running as administrator",
                     "Update Windows audio drivers",
@@ -657,82 +1856,227 @@ class PurePythonAudioHandler:
             return error_response
             
         except Exception as e:
-            logger.error(f"❌ Unexpected error in play_audio_file: {e}")
+            logger.error("Unexpected error in play_audio_file: %s", e)
             return {
                 "success": False,
                 "error": str(e),
-                "file_path": str(file_path) if 'file_path' in locals() else "unknown"
+                "file_path": str(file_path)
             }
     
+    def _info_wav(self, file_path: Path, stat: _FastStat) -> Dict[str, Any]:
+        """WAV metadata from the RIFF header parsed (and cached) for playback"""
+        wav = self._verify_audio_format(file_path, stat)
+        if "data_offset" not in wav:
+            return self._info_soundfile(file_path, stat)
+        duration = _wav_duration(wav, stat.st_size)
+        return {
+            "duration_ms": int(duration * 1000),
+            "duration_seconds": duration,
+            "channels": wav["channels"],
+            "sample_rate": wav["sample_rate"],
+            "sample_width": wav["bits_per_sample"] // 8
+        }
+    
+    def _info_soundfile(self, file_path: Path, stat: _FastStat) -> Dict[str, Any]:
+        """Metadata from libsndfile's header read; ffprobe if soundfile is missing"""
+        if not self._backends['soundfile'].load():
+            return self._info_ffprobe(file_path, stat)
+        sf_info = self._backends['soundfile'].module.info(str(file_path))
+        info = {
+            "duration_ms": int(sf_info.duration * 1000),
+            "duration_seconds": sf_info.duration,
+            "channels": sf_info.channels,
+            "sample_rate": sf_info.samplerate,
+            "subtype": sf_info.subtype_info
+        }
+        if sf_info.subtype in _SUBTYPE_WIDTHS:
+            info["sample_width"] = _SUBTYPE_WIDTHS[sf_info.subtype]
+        return info
+    
+    def _info_mp3(self, file_path: Path, stat: _FastStat) -> Dict[str, Any]:
+        """MP3 metadata from the first frame header; ffprobe if it can't be parsed"""
+        return _parse_mp3_header(file_path, stat.st_size) or self._info_ffprobe(file_path, stat)
+    
+    def _info_ffprobe(self, file_path: Path, stat: _FastStat) -> Dict[str, Any]:
+        """Metadata for formats libsndfile can't read"""
+        return _ffprobe_audio_info(file_path)
+    
     def get_audio_info(self, file_path: str) -> Dict[str, Any]:
-        """Get information about an audio file"""
+        """Get information about an audio file in the output directory"""
         try:
-            file_path = Path(file_path)
-            if not file_path.exists():
+            file_path = Path(_abs_str(os.fspath(file_path))).resolve()
+            if not _is_path_within_root(file_path, self._output_root):
+                return {"success": False, "error": f"File is outside the output directory: {file_path}"}
+            try:
+                stat = _fast_stat(file_path)
+            except FileNotFoundError:
                 return {"success": False, "error": "File not found"}
             
-            stat = file_path.stat()
+            cache_key = (str(file_path), stat.st_mtime_ns, stat.st_size)
+            cached = self._info_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            
+            size = stat.st_size
             info = {
                 "success": True,
                 "filename": file_path.name,
-                "size_bytes": stat.st_size,
-                "size_kb": round(stat.st_size / 1024, 2),
+                "size_bytes": size,
+                "size_kb": _size_kb(size),
                 "format": file_path.suffix.lower(),
-                "full_path": str(file_path.absolute())
+                "full_path": str(file_path)
             }
             
-            # Try to get additional audio info if pydub is available
-            if self._audio_libraries.get('pydub', False):
-                try:
-                    from pydub import AudioSegment
-                    audio = AudioSegment.from_file(str(file_path))
-                    info.update({
-                        "duration_ms": len(audio),
-                        "duration_seconds": len(audio) / 1000.0,
-                        "channels": audio.channels,
-                        "sample_rate": audio.frame_rate,
-                        "sample_width": audio.sample_width
-                    })
-                except Exception as e:
-                    logger.warning(f"Could not get detailed audio info: {e}")
+            # Read durations and layout from the container header rather than
+            # decoding the samples, with a reader specialized per format
+            reader = self._info_readers.get(info["format"], self._info_soundfile)
+            try:
+                info.update(reader(file_path, stat))
+            except Exception as e:
+                logger.warning("Could not get detailed audio info: %s", e)
             
+            if len(self._info_cache) >= FORMAT_CACHE_SIZE:
+                self._info_cache.pop(next(iter(self._info_cache)))
+            self._info_cache[cache_key] = info
             return info
             
         except Exception as e:
             return {"success": False, "error": str(e)}
     
+    def _scan_audio_entries(self) -> Iterator[Tuple[str, str, str, Optional[os.stat_result]]]:
+        """Yield (name, extension, full path, stat or None) per audio file in the output directory"""
+        # DirEntry carries the file type from the directory read, so only
+        # audio files cost a (statx) syscall. On Windows the directory read
+        # also returns size and times, so DirEntry.stat() needs no syscall.
+        with os.scandir(self.output_dir_str) as entries:
+            for entry in entries:
+                # Extension first: a string op that rejects most non-audio entries
+                name = entry.name
+                dot = name.rfind('.')
+                if dot < 0:
+                    continue
+                ext = name[dot + 1:].lower()
+                # Symlinks are skipped outright: no readlink/stat of the target,
+                # and nothing outside the output directory is ever listed
+                if ext in AUDIO_EXTENSIONS and entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False) if self.is_windows else None
+                    yield name, ext, os.path.join(self.output_dir_str, name), stat
+    
+    @staticmethod
+    def _stat_paths(paths: List[str]) -> List[os.stat_result]:
+        if len(paths) >= LIST_PARALLEL_STAT_MIN:
+            # statx runs through ctypes without the GIL, so a few threads
+            # keep several metadata lookups in flight at once
+            with ThreadPoolExecutor(max_workers=LIST_STAT_WORKERS, thread_name_prefix="audio-stat") as ex:
+                return list(ex.map(_fast_stat, paths, chunksize=64))
+        return [_fast_stat(path) for path in paths]
+    
+    def _cached_entries_unchanged(self) -> bool:
+        """Whether every listed file still has its cached size and mtime
+        
+        Rewriting or appending to a file in place leaves the directory's
+        mtime alone, so the files themselves are re-stat'ed.
+        """
+        entries = list(self._file_meta_cache.values())
+        try:
+            stats = self._stat_paths([entry.path for entry in entries])
+        except OSError:
+            return False
+        return all(stat.st_mtime_ns == entry.mtime_ns and stat.st_size == entry.size
+                   for entry, stat in zip(entries, stats))
+    
+    def _audio_file_entry(self, name: str, ext: str, full_path: str, stat) -> _AudioEntry:
+        """Listing entry for one file, reused from the last listing if the file is unchanged"""
+        cached = self._file_meta_cache.get(name)
+        if cached is not None and cached.mtime_ns == stat.st_mtime_ns and cached.size == stat.st_size:
+            return cached
+        return _AudioEntry(name, ext, full_path, stat.st_size, stat.st_mtime, stat.st_mtime_ns)
+    
+    def iter_audio_files(self) -> Iterator[Dict[str, Any]]:
+        """Yield audio files in the output directory one at a time, in directory order"""
+        for name, ext, full_path, stat in self._scan_audio_entries():
+            if stat is None:
+                try:
+                    stat = _fast_stat(full_path)
+                except FileNotFoundError:
+                    continue  # removed since the directory was read
+            yield self._audio_file_entry(name, ext, full_path, stat).as_dict()
+    
     def list_audio_files(self) -> Dict[str, Any]:
         """List all audio files in the output directory"""
         try:
-            audio_extensions = {".mp3", ".wav", ".ogg", ".m4a", ".flac", ".aac"}
-            audio_files = []
-            
-            for file_path in self.output_dir.iterdir():
-                if file_path.is_file() and file_path.suffix.lower() in audio_extensions:
-                    stat = file_path.stat()
-                    audio_files.append({
-                        "filename": file_path.name,
-                        "size_kb": round(stat.st_size / 1024, 2),
-                        "format": file_path.suffix.lower(),
-                        "full_path": str(file_path.absolute()),
-                        "modified_time": stat.st_mtime
-                    })
-            
-            # Sort by modification time (newest first)
-            audio_files.sort(key=lambda x: x["modified_time"], reverse=True)
+            # Adding, removing or renaming a file bumps the directory's mtime, so
+            # an unchanged mtime means the same set of files. A directory
+            # modified within the last LIST_CACHE_SETTLE_S might change again
+            # inside the same timestamp tick, so it is always rescanned.
+            dir_mtime_ns = _fast_stat(self.output_dir_str).st_mtime_ns
+            settled = time.time_ns() - dir_mtime_ns > LIST_CACHE_SETTLE_S * 1e9
+            if (settled and self._list_cache is not None and dir_mtime_ns == self._list_cache_dir_mtime
+                    and self._cached_entries_unchanged()):
+                return self._list_cache
             
-            return {
+            candidates = list(self._scan_audio_entries())
+            stats = [stat for _, _, _, stat in candidates]
+            missing = [i for i, stat in enumerate(stats) if stat is None]
+            fetched = self._stat_paths([candidates[i][2] for i in missing])
+            for i, stat in zip(missing, fetched):
+                stats[i] = stat
+            
+            # Files no longer present drop out of the per-file cache here
+            entries = [self._audio_file_entry(name, ext, full_path, stat)
+                       for (name, ext, full_path, _), stat in zip(candidates, stats)]
+            self._file_meta_cache = {entry.name: entry for entry in entries}
+            
+            # Sort by modification time (newest first); dicts are only built for the response
+            entries.sort(key=attrgetter("mtime"), reverse=True)
+            audio_files = [entry.as_dict() for entry in entries]
+            
+            self._list_cache = {
                 "success": True,
                 "count": len(audio_files),
                 "files": audio_files,
-                "output_directory": str(self.output_dir.absolute())
+                "output_directory": self.output_dir_str
             }
+            self._list_cache_dir_mtime = dir_mtime_ns
+            return self._list_cache
             
         except Exception as e:
             return {"success": False, "error": str(e)}
     
-    def test_audio_system(self) -> Dict[str, Any]:
-        """Test the audio system to verify it's working"""
+    def _test_library(self, lib_name: str) -> str:
+        """Import and exercise one library; returns its status line"""
+        if not self._backends[lib_name].load():
+            return "❌ Not installed"
+        
+        if lib_name == "pygame":
+            # Opens the shared mixer that playback reuses; already warm after the first call
+            frequency, _, channels = _ensure_pygame_mixer(self.mixer_buffer).get_init()
+            return f"✅ Mixer open ({frequency} Hz, {channels} ch)"
+        
+        elif lib_name == "sounddevice":
+            return f"✅ Found {_cached_device_count()} audio devices"
+        
+        elif lib_name == "pydub":
+            from pydub import AudioSegment
+            return "✅ Available for audio processing"
+        
+        elif lib_name == "simpleaudio":
+            import simpleaudio as sa
+            return "✅ Available for WAV playback"
+        
+        elif lib_name == "soundfile":
+            import soundfile as sf
+            return f"✅ libsndfile {sf.__libsndfile_version__}"
+        
+        return "✅ Loaded"
+    
+    def test_audio_system(self, deep: bool = False) -> Dict[str, Any]:
+        """Test the audio system to verify it's working
+        
+        Args:
+            deep: Import every library and open the pygame mixer. Otherwise only
+                report what is installed, without importing anything.
+        """
         try:
             results = {
                 "success": True,
@@ -740,35 +2084,35 @@ class PurePythonAudioHandler:
                 "recommendations": []
             }
             
-            # Test each available library
-            for lib_name, available in self._audio_libraries.items():
-                if available:
+            if deep:
+                # The libraries are independent, so a slow import or mixer init
+                # only delays its own result; wait at most LIBRARY_TEST_TIMEOUT
+                ex = ThreadPoolExecutor(max_workers=4, thread_name_prefix="audio-test")
+                futures = {lib_name: ex.submit(self._test_library, lib_name) for lib_name in self._backends}
+                deadline = time.monotonic() + LIBRARY_TEST_TIMEOUT
+                for lib_name, future in futures.items():
                     try:
-                        if lib_name == "pygame":
-                            import pygame
-                            pygame.mixer.pre_init(frequency=44100, size=-16, channels=2, buffer=1024)
-                            pygame.mixer.init()
-                            results["library_tests"][lib_name] = "✅ Initialized successfully"
-                            pygame.mixer.quit()
-                        
-                        elif lib_name == "sounddevice":
-                            import sounddevice as sd
-                            devices = sd.query_devices()
-                            results["library_tests"][lib_name] = f"✅ Found {len(devices)} audio devices"
-                        
-                        elif lib_name == "pydub":
-                            from pydub import AudioSegment
-                            results["library_tests"][lib_name] = "✅ Available for audio processing"
-                        
-                        elif lib_name == "simpleaudio":
-                            import simpleaudio as sa
-                            results["library_tests"][lib_name] = "✅ Available for WAV playback"
-                            
+                        status = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                    except FuturesTimeoutError:
+                        status = f"❌ Timed out after {LIBRARY_TEST_TIMEOUT:g}s"
                     except Exception as e:
-                        results["library_tests"][lib_name] = f"❌ Error: {e}"
+                        status = f"❌ Error: {e}"
+                    results["library_tests"][lib_name] = status
+                    if status.startswith("❌") and status != "❌ Not installed":
                         results["success"] = False
-                else:
-                    results["library_tests"][lib_name] = "❌ Not installed"
+                ex.shutdown(wait=False)
+            else:
+                for lib_name, backend in self._backends.items():
+                    if backend.available is not None:
+                        results["library_tests"][lib_name] = "✅ Loaded" if backend.available else "❌ Failed to load"
+                    else:
+                        results["library_tests"][lib_name] = "✅ Installed" if backend.installed() else "❌ Not installed"
+                # Report the shared mixer if it is already open; never open it here
+                pygame = self._backends["pygame"].module
+                mixer_init = pygame.mixer.get_init() if pygame is not None else None
+                if mixer_init:
+                    frequency, _, channels = mixer_init
+                    results["library_tests"]["pygame"] = f"✅ Mixer open ({frequency} Hz, {channels} ch)"
             
             # Add recommendations based on test results
             if not any(self._audio_libraries.values()):
@@ -794,6 +2138,8 @@ def main():
     """Command line interface for audio handler"""
     import argparse
     
+    logging.basicConfig(level=logging.INFO)
+    
     parser = argparse.ArgumentParser(description="Pure Python Audio Handler")
     parser.add_argument("action", choices=["play", "info", "list", "test"], 
                        help="Action to perform")
@@ -818,9 +2164,14 @@ def main():
     elif args.action == "list":
         result = handler.list_audio_files()
     elif args.action == "test":
-        result = handler.test_audio_system()
+        result = handler.test_audio_system(deep=True)
     
-    print(json.dumps(result, indent=2))
+    if orjson is not None:
+        # Raw UTF-8 bytes: the status lines carry emoji a legacy console codec can't encode
+        sys.stdout.buffer.write(orjson.dumps(result, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY) + b"\n")
+        sys.stdout.flush()
+    else:
+        print(json.dumps(result, indent=2, default=str))
     
     if not result.get("success", False):
         sys.exit(1)
@@ -7,12 +7,30 @@ using the Kokoro-FastAPI model deployed at localhost:8880.
 """
 
 import asyncio
+import functools
+import hashlib
 import json
 import logging
 import os
+import re
+import shutil
+import struct
+import tempfile
+import time
+from collections import OrderedDict
 from datetime import datetime
-from typing import Any, Dict, List, Optional
-import requests
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import aiofiles
+import httpx
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    # SIMD-accelerated drop-in for base64.b64encode
+    from pybase64 import b64encode
+except ImportError:
+    from base64 import b64encode
 from mcp.server.models import InitializationOptions
 from mcp.server import NotificationOptions, Server
 from mcp.types import (
@@ -34,57 +52,446 @@ logger = logging.getLogger("kokoro-tts-mcp")
 
 # Server configuration - support both local and containerized deployment
 KOKORO_BASE_URL = os.getenv("KOKORO_API_URL", os.getenv("KOKORO_BASE_URL", "http://localhost:8880"))
+# Speech synthesis of long texts can take a while; keep-alive connections are
+# pooled and reused across tool calls
+KOKORO_HTTP_TIMEOUT = 60.0
+KOKORO_MAX_KEEPALIVE = 16
+KOKORO_MAX_CONNECTIONS = 32
+# Speech request bodies are pre-encoded JSON sent as raw content
+_JSON_HEADERS = {"Content-Type": "application/json"}
+# Audio is streamed to disk in chunks of this size; for WAV only the leading
+# header bytes are kept in memory so their size fields can be patched
+SPEECH_STREAM_CHUNK = 65536
+WAV_HEADER_BYTES = 4096
+# Speech requests sent to Kokoro-FastAPI at once; past its real-time point more
+# parallel requests only slow every one of them down, so extra calls queue here
+KOKORO_MAX_INFLIGHT = int(os.getenv("KOKORO_MAX_INFLIGHT", "3"))
+_tts_sem = asyncio.Semaphore(KOKORO_MAX_INFLIGHT)
+# Long WAV requests are split at sentence ends into segments of at least
+# SEGMENT_MIN_CHARS, synthesized concurrently and played as each one arrives
+PIPELINE_MIN_CHARS = 200
+SEGMENT_MIN_CHARS = 80
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+# Characters dropped from text when it is used in a file name
+_UNSAFE_FILENAME_RE = re.compile(r"[^\w \-]")
+# The voice catalog only changes when the service is redeployed; health is
+# re-checked more often
+VOICES_CACHE_TTL = 60.0
+HEALTH_CACHE_TTL = 5.0
+# Fallback delay before removing a temporary playback file
+TEMP_AUDIO_CLEANUP_DELAY = 5.0
+# Longest wait for a playback to finish before its temp file is removed anyway:
+# the clip's length plus a margin, or a fixed cap when the length is unknown
+TEMP_AUDIO_PLAYBACK_MARGIN = 30.0
+TEMP_AUDIO_MAX_WAIT = 600.0
 server = Server("kokoro-tts")
 
+# Directories already created by this process
+_dirs_ensured: set = set()
+
+def _ensure_dir(path: str) -> None:
+    """Create a directory, at most once per process."""
+    if path not in _dirs_ensured:
+        os.makedirs(path, exist_ok=True)
+        _dirs_ensured.add(path)
+
 # Create output directory for containerized environment
 OUTPUT_DIR = "/app/output" if os.path.exists("/app") else "./output"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+_ensure_dir(OUTPUT_DIR)
+
+# Synthesized audio is cached under OUTPUT_DIR/.cache and evicted least
+# recently used past either limit; KOKORO_TTS_CACHE_MB=0 disables the cache
+TTS_CACHE_DIR = os.path.join(OUTPUT_DIR, ".cache")
+TTS_CACHE_MAX_BYTES = int(float(os.getenv("KOKORO_TTS_CACHE_MB", "100")) * 1024 * 1024)
+TTS_CACHE_MAX_ENTRIES = 512
 
 # Initialize audio handler
 audio_handler = AudioHandler(OUTPUT_DIR)
 
+def _fix_streamed_wav_header(header: bytearray, total_size: int) -> Optional[bytes]:
+    """Set the RIFF and data chunk sizes in a streamed WAV header to match the
+    file's final length; returns the patched header, or None if it was correct."""
+    if header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+        return None
+    modified = False
+    if struct.unpack_from("<I", header, 4)[0] != total_size - 8:
+        struct.pack_into("<I", header, 4, total_size - 8)
+        modified = True
+    pos = 12
+    while pos + 8 <= len(header):
+        chunk_id, size = struct.unpack_from("<4sI", header, pos)
+        if chunk_id == b"data":
+            data_size = total_size - pos - 8
+            if size != data_size:
+                struct.pack_into("<I", header, pos + 4, data_size)
+                modified = True
+            break
+        pos += 8 + size + (size & 1)
+    return bytes(header) if modified else None
+
+def _format_json(data: Any) -> str:
+    """Indented JSON for tool output, encoded with orjson when it is installed."""
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(data, indent=2)
+
+def _json_bytes(data: Any) -> bytes:
+    """Compact JSON bytes, encoded with orjson when it is installed."""
+    if orjson:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode()
+
+@functools.lru_cache(maxsize=64)
+def _speech_payload_prefix(voice: str, response_format: str, speed: float) -> bytes:
+    """The speech request body up to its input field, encoded once per voice/format/speed."""
+    static = {"model": "kokoro", "voice": voice, "response_format": response_format, "speed": speed}
+    return _json_bytes(static)[:-1] + b',"input":'
+
+def _wav_data_offset(audio: bytes) -> int:
+    """Offset of the first sample in a complete WAV file."""
+    pos = 12
+    while pos + 8 <= len(audio):
+        chunk_id, size = struct.unpack_from("<4sI", audio, pos)
+        if chunk_id == b"data":
+            return pos + 8
+        pos += 8 + size + (size & 1)
+    raise ValueError("WAV audio has no data chunk")
+
+def _playback_wait_limit(audio: bytes) -> float:
+    """Seconds to wait for audio to finish playing: its WAV length plus a margin."""
+    # fmt is the first chunk in the WAVs Kokoro produces; other formats get the cap
+    if audio[:4] != b"RIFF" or audio[12:16] != b"fmt " or len(audio) < 32:
+        return TEMP_AUDIO_MAX_WAIT
+    byte_rate = struct.unpack_from("<I", audio, 28)[0]
+    try:
+        data_offset = _wav_data_offset(audio)
+    except ValueError:
+        return TEMP_AUDIO_MAX_WAIT
+    if not byte_rate:
+        return TEMP_AUDIO_MAX_WAIT
+    return (len(audio) - data_offset) / byte_rate + TEMP_AUDIO_PLAYBACK_MARGIN
+
+def _wav_sizes_match(audio: bytes) -> bool:
+    """True if a WAV buffer's magic and RIFF/data sizes already agree with its length."""
+    if audio[:4] != b"RIFF" or audio[8:12] != b"WAVE":
+        return False
+    try:
+        data_offset = _wav_data_offset(audio)
+    except ValueError:
+        return False
+    return (struct.unpack_from("<I", audio, 4)[0] == len(audio) - 8
+            and struct.unpack_from("<I", audio, data_offset - 4)[0] == len(audio) - data_offset)
+
+def _speech_segments(text: str, eager_first: bool = False) -> List[str]:
+    """Split long text at sentence ends into segments for pipelined synthesis.
+    
+    With eager_first (used when the audio is played as it arrives) the first
+    sentence is a segment of its own, so playback waits only for its synthesis.
+    """
+    if len(text) < (SEGMENT_MIN_CHARS if eager_first else PIPELINE_MIN_CHARS):
+        return [text]
+    segments = []
+    current = ""
+    for sentence in _SENTENCE_END_RE.split(text.strip()):
+        current = f"{current} {sentence}" if current else sentence
+        if len(current) >= SEGMENT_MIN_CHARS or (eager_first and not segments):
+            segments.append(current)
+            current = ""
+    if current:
+        segments.append(current)
+    return segments
+
+def _write_temp_audio(audio_data: bytes, format_type: str) -> str:
+    with tempfile.NamedTemporaryFile(suffix=f".{format_type}", delete=False) as temp_file:
+        temp_file.write(audio_data)
+        return temp_file.name
+
+def create_http_client(base_url: str = KOKORO_BASE_URL) -> httpx.AsyncClient:
+    """Pooled HTTP/2 client for the Kokoro-FastAPI service."""
+    # An explicit transport owns the HTTP/2 and pool settings; it retries a
+    # failed connect once, e.g. while the service is restarting
+    transport = httpx.AsyncHTTPTransport(
+        http2=True,
+        retries=1,
+        limits=httpx.Limits(
+            max_keepalive_connections=KOKORO_MAX_KEEPALIVE,
+            max_connections=KOKORO_MAX_CONNECTIONS
+        )
+    )
+    return httpx.AsyncClient(
+        base_url=base_url,
+        timeout=httpx.Timeout(KOKORO_HTTP_TIMEOUT),
+        transport=transport
+    )
+
+class SpeechCache:
+    """Bounded LRU cache of synthesized audio files on disk.
+    
+    Entries are copied in and out rather than hard-linked, so a later write to
+    an output file can never change a cached one.
+    """
+    
+    PARTIAL_SUFFIX = ".partial"
+    
+    def __init__(self, cache_dir: str = TTS_CACHE_DIR, max_bytes: int = TTS_CACHE_MAX_BYTES,
+                 max_entries: int = TTS_CACHE_MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # file name -> size
+        self._total_bytes = 0
+        self._lock = asyncio.Lock()
+        if self.enabled:
+            _ensure_dir(cache_dir)
+            # Pick up files cached by earlier runs, oldest first, dropping any
+            # half-written copies an interrupted store left behind
+            files = []
+            with os.scandir(cache_dir) as it:
+                for entry in it:
+                    if not entry.is_file():
+                        continue
+                    if entry.name.endswith(self.PARTIAL_SUFFIX):
+                        try:
+                            os.unlink(entry.path)
+                        except OSError:
+                            pass
+                        continue
+                    files.append((entry.stat(), entry.name))
+            for st, name in sorted(files, key=lambda f: f[0].st_mtime):
+                self._entries[name] = st.st_size
+                self._total_bytes += st.st_size
+            self._evict()
+    
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 and self.max_entries > 0
+    
+    @staticmethod
+    def key(text: str, voice: str, response_format: str, speed: float) -> str:
+        digest = hashlib.blake2b(f"{voice}|{response_format}|{speed}|{text}".encode(), digest_size=16)
+        return f"{digest.hexdigest()}.{response_format}"
+    
+    async def fetch(self, key: str, dst: str) -> Optional[int]:
+        """Place the cached audio for key at dst and return its size, or None on a miss."""
+        async with self._lock:
+            size = self._entries.get(key)
+            if size is None:
+                return None
+            self._entries.move_to_end(key)
+        try:
+            await asyncio.to_thread(shutil.copyfile, os.path.join(self.cache_dir, key), dst)
+        except OSError as e:
+            logger.warning(f"Speech cache entry unusable, dropping it: {e}")
+            async with self._lock:
+                self._discard(key)
+            return None
+        return size
+    
+    async def store(self, key: str, src: str, size: int) -> None:
+        """Add the audio file at src to the cache."""
+        if not self.enabled or size > self.max_bytes:
+            return
+        try:
+            await asyncio.to_thread(self._copy_in, src, key)
+        except OSError as e:
+            logger.warning(f"Could not cache speech: {e}")
+            return
+        async with self._lock:
+            self._discard(key, unlink=False)
+            self._entries[key] = size
+            self._total_bytes += size
+            self._evict()
+    
+    def _copy_in(self, src: str, key: str) -> None:
+        """Copy src to a private name, then rename it over the entry in one step,
+        so a concurrent fetch only ever sees a complete file."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=key + ".",
+                                        suffix=self.PARTIAL_SUFFIX)
+        os.close(fd)
+        try:
+            shutil.copyfile(src, tmp_path)
+            os.replace(tmp_path, os.path.join(self.cache_dir, key))
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+    
+    def _discard(self, key: str, unlink: bool = True) -> None:
+        size = self._entries.pop(key, None)
+        if size is None:
+            return
+        self._total_bytes -= size
+        if unlink:
+            try:
+                os.unlink(os.path.join(self.cache_dir, key))
+            except OSError:
+                pass
+    
+    def _evict(self) -> None:
+        while self._entries and (self._total_bytes > self.max_bytes or len(self._entries) > self.max_entries):
+            self._discard(next(iter(self._entries)))
+
 class KokoroTTSClient:
     """Client for interacting with Kokoro-FastAPI TTS service."""
     
-    def __init__(self, base_url: str = KOKORO_BASE_URL):
+    def __init__(self, base_url: str = KOKORO_BASE_URL, cache: Optional[SpeechCache] = None):
         self.base_url = base_url
-        self.session = requests.Session()
+        self.cache = cache if cache is not None else SpeechCache()
+        self._client = create_http_client(base_url)
+        # (monotonic time fetched, result)
+        self._voices_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._health_cache: Optional[Tuple[float, Dict[str, Any]]] = None
     
-    def get_available_voices(self) -> Dict[str, Any]:
+    async def use_http_client(self, client: httpx.AsyncClient) -> None:
+        """Switch to a client whose lifetime the caller manages (e.g. an app lifespan)."""
+        previous, self._client = self._client, client
+        if previous is not client:
+            await previous.aclose()
+    
+    async def aclose(self) -> None:
+        """Close pooled connections to the TTS service."""
+        await self._client.aclose()
+    
+    async def get_available_voices(self) -> Dict[str, Any]:
         """Get list of available voices from the TTS service."""
+        if self._voices_cache and time.monotonic() - self._voices_cache[0] < VOICES_CACHE_TTL:
+            return self._voices_cache[1]
         try:
-            response = self.session.get(f"{self.base_url}/v1/audio/voices")
+            response = await self._client.get("/v1/audio/voices")
             response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
+            voices = orjson.loads(response.content) if orjson else response.json()
+            self._voices_cache = (time.monotonic(), voices)
+            return voices
+        except httpx.HTTPError as e:
             logger.error(f"Failed to get voices: {e}")
             raise
     
-    def generate_speech(self, text: str, voice: str = "af_bella", 
-                       response_format: str = "wav", speed: float = 1.0) -> bytes:
+    def _speech_payload(self, text: str, voice: str, response_format: str, speed: float) -> bytes:
+        """JSON request body; only the input text is encoded per request."""
+        payload = _speech_payload_prefix(voice, response_format, speed) + _json_bytes(text) + b"}"
+        logger.info(f"Sending payload to Kokoro-FastAPI: {payload.decode()}")
+        return payload
+    
+    async def save_speech(self, file_path: str, text: str, voice: str = "af_bella",
+                          response_format: str = "wav", speed: float = 1.0,
+                          on_segment: Optional[Callable[[int, bytes], Awaitable[None]]] = None) -> int:
+        """Stream generated speech straight into file_path and return its size in bytes.
+        
+        Long WAV text is synthesized as concurrent sentence segments; each one is
+        passed to on_segment, in order, as soon as it and all before it are ready.
+        OSError means the file could not be written; httpx.HTTPError means the
+        service failed. On any failure the partial file is removed.
+        """
+        cache_key = SpeechCache.key(text, voice, response_format, speed)
+        if self.cache.enabled:
+            size = await self.cache.fetch(cache_key, file_path)
+            if size is not None:
+                logger.info(f"Speech cache hit: {cache_key}")
+                return size
+        
+        is_wav = response_format.lower() == "wav"
+        segments = _speech_segments(text, eager_first=on_segment is not None) if is_wav else [text]
+        
+        f = await aiofiles.open(file_path, "wb")
+        try:
+            try:
+                if len(segments) > 1:
+                    size = await self._write_segments(f, segments, voice, speed, on_segment)
+                else:
+                    async with _tts_sem:
+                        size = await self._stream_speech(f, text, voice, response_format, speed, is_wav)
+            finally:
+                await f.close()
+        except BaseException as e:
+            # Never leave a truncated file behind, whatever interrupted the write
+            if isinstance(e, httpx.HTTPError):
+                logger.error(f"Failed to generate speech: {e}")
+            try:
+                os.unlink(file_path)
+            except OSError:
+                pass
+            raise
+        
+        if size:
+            await self.cache.store(cache_key, file_path, size)
+        return size
+    
+    async def _stream_speech(self, f, text: str, voice: str, response_format: str, speed: float,
+                             is_wav: bool) -> int:
+        payload = self._speech_payload(text, voice, response_format, speed)
+        header = bytearray()
+        size = 0
+        
+        async with self._client.stream("POST", "/v1/audio/speech", content=payload,
+                                       headers=_JSON_HEADERS) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes(SPEECH_STREAM_CHUNK):
+                if is_wav and len(header) < WAV_HEADER_BYTES:
+                    header += chunk[:WAV_HEADER_BYTES - len(header)]
+                await f.write(chunk)
+                size += len(chunk)
+        
+        # Streamed WAVs can carry placeholder sizes; patch them in place
+        if is_wav:
+            fixed_header = _fix_streamed_wav_header(header, size)
+            if fixed_header is not None:
+                await f.seek(0)
+                await f.write(fixed_header)
+                logger.info("✅ WAV header sizes fixed after streaming")
+        return size
+    
+    async def _write_segments(self, f, segments: List[str], voice: str, speed: float,
+                              on_segment: Optional[Callable[[int, bytes], Awaitable[None]]]) -> int:
+        """Synthesize WAV segments concurrently and append them to f as one WAV."""
+        async def synthesize(segment: str) -> bytes:
+            async with _tts_sem:
+                return await self.generate_speech(segment, voice, "wav", speed)
+        
+        logger.info(f"Synthesizing {len(segments)} segments concurrently")
+        tasks = [asyncio.create_task(synthesize(segment)) for segment in segments]
+        header = bytearray()
+        size = 0
+        try:
+            # Segments may finish in any order but are written and played in text order
+            for index, task in enumerate(tasks):
+                audio = await task
+                if on_segment is not None:
+                    await on_segment(index, audio)
+                if index == 0:
+                    header = bytearray(audio[:WAV_HEADER_BYTES])
+                    body = audio
+                else:
+                    body = memoryview(audio)[_wav_data_offset(audio):]
+                await f.write(body)
+                size += len(body)
+        finally:
+            for task in tasks:
+                task.cancel()
+        
+        # The first segment's header still describes only that segment
+        fixed_header = _fix_streamed_wav_header(header, size)
+        if fixed_header is not None:
+            await f.seek(0)
+            await f.write(fixed_header)
+        return size
+    
+    async def generate_speech(self, text: str, voice: str = "af_bella",
+                              response_format: str = "wav", speed: float = 1.0) -> bytes:
         """Generate speech from text using the TTS service."""
         try:
-            payload = {
-                "model": "kokoro",
-                "input": text,
-                "voice": voice,
-                "response_format": response_format,
-                "speed": speed
-            }
-            
-            logger.info(f"Sending payload to Kokoro-FastAPI: {payload}")
+            payload = self._speech_payload(text, voice, response_format, speed)
             
-            response = self.session.post(
-                f"{self.base_url}/v1/audio/speech",
-                json=payload
-            )
+            response = await self._client.post("/v1/audio/speech", content=payload, headers=_JSON_HEADERS)
             response.raise_for_status()
             
             # Get raw audio data
             audio_data = response.content
             
-            # Fix WAV header corruption if format is WAV
-            if response_format.lower() == "wav":
+            # Fix WAV header corruption if format is WAV; a header whose sizes
+            # already match the body needs neither the fixer nor a full scan
+            if response_format.lower() == "wav" and not _wav_sizes_match(audio_data):
                 logger.info("Validating and fixing WAV header...")
                 
                 # Validate the audio data
@@ -104,120 +511,168 @@ class KokoroTTSClient:
             
             return audio_data
             
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Failed to generate speech: {e}")
             raise
     
-    def check_service_health(self) -> Dict[str, Any]:
+    async def check_service_health(self) -> Dict[str, Any]:
         """Check if the TTS service is running and healthy."""
+        if self._health_cache and time.monotonic() - self._health_cache[0] < HEALTH_CACHE_TTL:
+            return self._health_cache[1]
         try:
-            response = self.session.get(f"{self.base_url}/docs")
-            if response.status_code == 200:
-                return {"status": "healthy", "service": "Kokoro-FastAPI"}
+            # Only the status line matters, so the body is never downloaded;
+            # older Kokoro-FastAPI builds have no /health and fall back to /docs
+            for path in ("/health", "/docs"):
+                async with self._client.stream("GET", path) as response:
+                    status_code = response.status_code
+                if status_code != 404:
+                    break
+            if status_code == 200:
+                status = {"status": "healthy", "service": "Kokoro-FastAPI"}
             else:
-                return {"status": "unhealthy", "error": f"HTTP {response.status_code}"}
-        except requests.RequestException as e:
-            return {"status": "unreachable", "error": str(e)}
+                status = {"status": "unhealthy", "error": f"HTTP {status_code}"}
+        except httpx.HTTPError as e:
+            status = {"status": "unreachable", "error": str(e)}
+        self._health_cache = (time.monotonic(), status)
+        return status
 
 # Initialize TTS client
 tts_client = KokoroTTSClient()
 
+# Pending background tasks, referenced so they aren't collected mid-flight
+_background_tasks: set = set()
+
+def _spawn(coro: Awaitable[Any]) -> None:
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+async def _unlink_after_playback(path: str, playback_id: Optional[str] = None,
+                                 max_wait: float = TEMP_AUDIO_MAX_WAIT) -> None:
+    """Remove a temporary playback file once its playback has finished.
+    
+    A playback still running after max_wait seconds is assumed hung, and the
+    file is removed regardless.
+    """
+    future = audio_handler.playback_future(playback_id) if playback_id else None
+    try:
+        if future is None:
+            await asyncio.sleep(TEMP_AUDIO_CLEANUP_DELAY)
+        else:
+            # Awaited on the loop, so pending cleanups don't hold executor threads;
+            # shielded so cancelling this task can't cancel the handler's future
+            try:
+                await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), max_wait)
+            except asyncio.TimeoutError:
+                logger.warning(f"Playback {playback_id} still running after {max_wait:.0f}s")
+            except Exception:
+                pass
+    finally:
+        try:
+            await asyncio.to_thread(os.unlink, path)
+            logger.info(f"🗑️ Cleaned up temporary file: {path}")
+        except OSError as cleanup_error:
+            logger.warning(f"Could not clean up temp file: {cleanup_error}")
+
+# Tool schemas are fixed, so they are built once at import
+TOOL_LIST: List[Tool] = [
+    Tool(
+        name="generate_speech",
+        description="Generate speech audio from text using Kokoro TTS model",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "text": {
+                    "type": "string",
+                    "description": "The text to convert to speech"
+                },
+                "voice": {
+                    "type": "string",
+                    "description": "Voice to use (e.g., 'af_bella', 'af_sky', or combinations like 'af_bella+af_sky')",
+                    "default": "af_bella"
+                },
+                "format": {
+                    "type": "string",
+                    "enum": ["mp3", "wav", "opus", "flac"],
+                    "description": "Audio format for the output",
+                    "default": "wav"
+                },
+                "speed": {
+                    "type": "number",
+                    "description": "Speech speed (0.5 to 2.0)",
+                    "minimum": 0.5,
+                    "maximum": 2.0,
+                    "default": 1.0
+                },
+                "output_file": {
+                    "type": "string",
+                    "description": "Optional output file path to save the audio"
+                },
+                "auto_play": {
+                    "type": "boolean",
+                    "description": "Automatically play the generated audio (optional, defaults to true)",
+                    "default": True
+                }
+            },
+            "required": ["text"]
+        }
+    ),
+    Tool(
+        name="list_voices",
+        description="Get list of available voices from Kokoro TTS",
+        inputSchema={
+            "type": "object",
+            "properties": {},
+            "additionalProperties": False
+        }
+    ),
+    Tool(
+        name="check_tts_status",
+        description="Check if the Kokoro TTS service is running and accessible",
+        inputSchema={
+            "type": "object",
+            "properties": {},
+            "additionalProperties": False
+        }
+    ),
+    Tool(
+        name="play_audio",
+        description="Play an audio file using system default player",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "filename": {
+                    "type": "string",
+                    "description": "Name of the audio file to play (from output directory)"
+                }
+            },
+            "required": ["filename"]
+        }
+    ),
+    Tool(
+        name="list_audio_files",
+        description="List all audio files in the output directory",
+        inputSchema={
+            "type": "object",
+            "properties": {},
+            "additionalProperties": False
+        }
+    ),
+    Tool(
+        name="open_output_folder",
+        description="Open the output folder in file explorer",
+        inputSchema={
+            "type": "object",
+            "properties": {},
+            "additionalProperties": False
+        }
+    )
+]
+
 @server.list_tools()
 async def handle_list_tools() -> List[Tool]:
     """List available tools."""
-    return [
-        Tool(
-            name="generate_speech",
-            description="Generate speech audio from text using Kokoro TTS model",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "text": {
-                        "type": "string",
-                        "description": "The text to convert to speech"
-                    },
-                    "voice": {
-                        "type": "string",
-                        "description": "Voice to use (e.g., 'af_bella', 'af_sky', or combinations like 'af_bella+af_sky')",
-                        "default": "af_bella"
-                    },
-                    "format": {
-                        "type": "string",
-                        "enum": ["mp3", "wav", "opus", "flac"],
-                        "description": "Audio format for the output",
-                        "default": "wav"
-                    },
-                    "speed": {
-                        "type": "number",
-                        "description": "Speech speed (0.5 to 2.0)",
-                        "minimum": 0.5,
-                        "maximum": 2.0,
-                        "default": 1.0
-                    },
-                    "output_file": {
-                        "type": "string",
-                        "description": "Optional output file path to save the audio"
-                    },
-                    "auto_play": {
-                        "type": "boolean",
-                        "description": "Automatically play the generated audio (optional, defaults to true)",
-                        "default": True
-                    }
-                },
-                "required": ["text"]
-            }
-        ),
-        Tool(
-            name="list_voices",
-            description="Get list of available voices from Kokoro TTS",
-            inputSchema={
-                "type": "object",
-                "properties": {},
-                "additionalProperties": False
-            }
-        ),
-        Tool(
-            name="check_tts_status",
-            description="Check if the Kokoro TTS service is running and accessible",
-            inputSchema={
-                "type": "object",
-                "properties": {},
-                "additionalProperties": False
-            }
-        ),
-        Tool(
-            name="play_audio",
-            description="Play an audio file using system default player",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "filename": {
-                        "type": "string",
-                        "description": "Name of the audio file to play (from output directory)"
-                    }
-                },
-                "required": ["filename"]
-            }
-        ),
-        Tool(
-            name="list_audio_files",
-            description="List all audio files in the output directory",
-            inputSchema={
-                "type": "object",
-                "properties": {},
-                "additionalProperties": False
-            }
-        ),
-        Tool(
-            name="open_output_folder",
-            description="Open the output folder in file explorer",
-            inputSchema={
-                "type": "object",
-                "properties": {},
-                "additionalProperties": False
-            }
-        )
-    ]
+    return TOOL_LIST
 
 @server.call_tool()
 async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[types.TextContent | types.ImageContent | types.EmbeddedResource]:
@@ -231,28 +686,36 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[types.T
         output_file = arguments.get("output_file")
         auto_play = arguments.get("auto_play", True)
         
-        # Force WAV format if not explicitly specified
-        if "format" not in arguments:
-            format_type = "wav"
-        
         logger.info(f"Received arguments: {arguments}")
-        logger.info(f"Format type extracted: {format_type}")
         logger.info(f"Final format being sent to API: {format_type}")
         
         if not text:
             return [types.TextContent(type="text", text="Error: Text is required for speech generation")]
         
+        # Long text starts playing segment by segment while the rest is synthesized
+        segment_playbacks: List[Dict[str, Any]] = []
+        
+        async def play_segment(index: int, segment_audio: bytes) -> None:
+            # Playback is best-effort; a failure here must never fail the save
+            segment_file = None
+            try:
+                segment_file = await asyncio.to_thread(_write_temp_audio, segment_audio, format_type)
+                segment_result = await asyncio.to_thread(audio_handler.play_audio_file, segment_file)
+            except Exception as play_error:
+                logger.error(f"❌ Segment {index} playback exception: {play_error}")
+                segment_playbacks.append({"success": False, "error": str(play_error)})
+                if segment_file:
+                    _spawn(_unlink_after_playback(segment_file))
+                return
+            segment_playbacks.append(segment_result)
+            _spawn(_unlink_after_playback(segment_file, segment_result.get("playback_id"),
+                                          _playback_wait_limit(segment_audio)))
+        
         try:
-            # Generate speech
-            audio_data = tts_client.generate_speech(
-                text=text,
-                voice=voice,
-                response_format=format_type,
-                speed=speed
-            )
-            
-            # ALWAYS save files with timestamped names for consistency
+            # ALWAYS save files with timestamped names for consistency;
+            # the audio is streamed straight to that file
             saved_file_path = None
+            audio_data = None
             try:
                 # Generate timestamped filename if not provided
                 if output_file:
@@ -265,33 +728,50 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[types.T
                     # Generate automatic timestamped filename
                     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                     # Clean text for filename (first 30 chars, safe characters only)
-                    safe_text = "".join(c for c in text[:30] if c.isalnum() or c in (' ', '-', '_')).strip()
-                    safe_text = safe_text.replace(' ', '_')
-                    if not safe_text:
-                        safe_text = "speech"
+                    safe_text = _UNSAFE_FILENAME_RE.sub("", text[:30]).strip().replace(' ', '_') or "speech"
                     
                     filename = f"{timestamp}_{safe_text}_{voice}.{format_type}"
                     saved_file_path = os.path.join(OUTPUT_DIR, filename)
                 
-                # Ensure output directory exists
-                os.makedirs(OUTPUT_DIR, exist_ok=True)
-                if saved_file_path != OUTPUT_DIR:  # Don't try to create parent if it's the same as output dir
-                    os.makedirs(os.path.dirname(saved_file_path), exist_ok=True)
+                # Ensure output directory exists (once per process)
+                parent_dir = os.path.dirname(saved_file_path)
+                for directory in (OUTPUT_DIR, parent_dir):
+                    if directory and directory not in _dirs_ensured:
+                        await asyncio.to_thread(_ensure_dir, directory)
                 
-                # Save the audio file with proper error handling
-                with open(saved_file_path, "wb") as f:
-                    f.write(audio_data)
+                # Generate speech into the file
+                audio_size = await tts_client.save_speech(
+                    saved_file_path,
+                    text=text,
+                    voice=voice,
+                    response_format=format_type,
+                    speed=speed,
+                    on_segment=play_segment if auto_play else None
+                )
                 
                 # Verify file was saved successfully
-                if not os.path.exists(saved_file_path) or os.path.getsize(saved_file_path) == 0:
+                if audio_size == 0:
                     raise Exception(f"File was not saved properly: {saved_file_path}")
                 
                 logger.info(f"✅ Audio file saved successfully: {saved_file_path}")
                 
+            except httpx.HTTPError:
+                raise
             except Exception as save_error:
                 logger.error(f"❌ Failed to save audio file: {save_error}")
-                # Continue with playback even if save failed
+                if isinstance(save_error, FileNotFoundError):
+                    # The directory was removed while running; recreate it next time
+                    _dirs_ensured.discard(os.path.dirname(saved_file_path or ""))
+                # Continue with the audio in memory even if save failed
                 saved_file_path = None
+                async with _tts_sem:
+                    audio_data = await tts_client.generate_speech(
+                        text=text,
+                        voice=voice,
+                        response_format=format_type,
+                        speed=speed
+                    )
+                audio_size = len(audio_data)
             
             # Handle auto-play
             auto_play_message = ""
@@ -300,26 +780,19 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[types.T
             if auto_play:
                 try:
                     # If we don't have a saved file, create a temporary one for playback
-                    if not playback_file:
-                        import tempfile
-                        with tempfile.NamedTemporaryFile(suffix=f".{format_type}", delete=False) as temp_file:
-                            temp_file.write(audio_data)
-                            playback_file = temp_file.name
-                        
-                        # Schedule cleanup for temp file
-                        import threading
-                        def delayed_cleanup():
-                            import time
-                            time.sleep(5)  # Wait 5 seconds before cleanup
-                            try:
-                                os.unlink(playback_file)
-                                logger.info(f"🗑️ Cleaned up temporary file: {playback_file}")
-                            except Exception as cleanup_error:
-                                logger.warning(f"Could not clean up temp file: {cleanup_error}")
-                        threading.Thread(target=delayed_cleanup, daemon=True).start()
+                    temp_playback = not playback_file and not segment_playbacks
+                    if temp_playback:
+                        playback_file = await asyncio.to_thread(_write_temp_audio, audio_data, format_type)
                     
-                    # Attempt playback
-                    play_result = audio_handler.play_audio_file(playback_file)
+                    # Attempt playback, unless segments already started it
+                    if segment_playbacks:
+                        play_result = next((r for r in segment_playbacks if r.get("success")), segment_playbacks[0])
+                    else:
+                        play_result = await asyncio.to_thread(audio_handler.play_audio_file, playback_file)
+                        if temp_playback:
+                            # Schedule cleanup for temp file once it has played
+                            _spawn(_unlink_after_playback(playback_file, play_result.get("playback_id"),
+                                                          _playback_wait_limit(audio_data)))
                     if play_result.get("success"):
                         auto_play_message = f"\n🔊 Audio is now playing with {play_result.get('method', 'unknown method')}."
                         logger.info(f"✅ Audio playback started: {play_result.get('method')}")
@@ -332,39 +805,39 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[types.T
                     logger.error(f"❌ Audio playback exception: {play_error}")
             
             # Prepare response message
+            speech_details = (
+                f"💬 Text: {text[:100]}{'...' if len(text) > 100 else ''}\n"
+                f"🎭 Voice: {voice}\n"
+                f"🎵 Format: {format_type}\n"
+                f"⚡ Speed: {speed}\n"
+            )
             if saved_file_path:
                 response_text = (
                     f"✅ Speech generated and saved successfully!\n"
                     f"📁 File: {os.path.basename(saved_file_path)}\n"
                     f"📍 Location: {saved_file_path}\n"
-                    f"💬 Text: {text[:100]}{'...' if len(text) > 100 else ''}\n"
-                    f"🎭 Voice: {voice}\n"
-                    f"🎵 Format: {format_type}\n"
-                    f"⚡ Speed: {speed}\n"
-                    f"📊 File size: {len(audio_data):,} bytes{auto_play_message}"
+                    f"{speech_details}"
+                    f"📊 File size: {audio_size:,} bytes{auto_play_message}"
                 )
             else:
                 response_text = (
                     f"⚠️ Speech generated but file save failed!\n"
-                    f"💬 Text: {text[:100]}{'...' if len(text) > 100 else ''}\n"
-                    f"🎭 Voice: {voice}\n"
-                    f"🎵 Format: {format_type}\n"
-                    f"⚡ Speed: {speed}\n"
-                    f"📊 Audio size: {len(audio_data):,} bytes{auto_play_message}\n"
+                    f"{speech_details}"
+                    f"📊 Audio size: {audio_size:,} bytes{auto_play_message}\n"
                     f"💡 Try checking output directory permissions or disk space."
                 )
             
             # Always return text content with file info
             results = [types.TextContent(type="text", text=response_text)]
             
-            # If no file was saved, also return embedded resource as fallback
+            # If no file was saved, also return embedded resource as fallback;
+            # the audio travels once, in the blob, and the URI only names it
             if not saved_file_path:
-                import base64
-                audio_base64 = base64.b64encode(audio_data).decode('utf-8')
+                audio_base64 = (await asyncio.to_thread(b64encode, audio_data)).decode('ascii')
                 results.append(types.EmbeddedResource(
                     type="resource",
                     resource=types.BlobResourceContents(
-                        uri=f"data:audio/{format_type};base64,{audio_base64}",
+                        uri=f"kokoro-tts://speech/generated.{format_type}",
                         mimeType=f"audio/{format_type}",
                         blob=audio_base64
                     )
@@ -377,20 +850,20 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[types.T
     
     elif name == "list_voices":
         try:
-            voices_data = tts_client.get_available_voices()
+            voices_data = await tts_client.get_available_voices()
             return [types.TextContent(
                 type="text",
-                text=f"Available voices:\n{json.dumps(voices_data, indent=2)}"
+                text=f"Available voices:\n{_format_json(voices_data)}"
             )]
         except Exception as e:
             return [types.TextContent(type="text", text=f"Error getting voices: {str(e)}")]
     
     elif name == "check_tts_status":
         try:
-            status = tts_client.check_service_health()
+            status = await tts_client.check_service_health()
             return [types.TextContent(
                 type="text",
-                text=f"TTS Service Status:\n{json.dumps(status, indent=2)}"
+                text=f"TTS Service Status:\n{_format_json(status)}"
             )]
         except Exception as e:
             return [types.TextContent(type="text", text=f"Error checking status: {str(e)}")]
@@ -407,7 +880,7 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[types.T
              else:
                  file_path = filename
                  
-             result = audio_handler.play_audio_file(file_path)
+             result = await asyncio.to_thread(audio_handler.play_audio_file, file_path)
              if result.get("success"):
                  return [types.TextContent(
                      type="text",
@@ -423,7 +896,7 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[types.T
     
     elif name == "list_audio_files":
          try:
-             result = audio_handler.list_audio_files()
+             result = await asyncio.to_thread(audio_handler.list_audio_files)
              if result.get("success") and result.get("files"):
                  files = result["files"]
                  file_list = "\n".join([f"- {f['filename']} ({f['size_kb']} KB)" for f in files])
@@ -463,19 +936,22 @@ async def main():
     # Import here to avoid issues with event loop
     from mcp.server.stdio import stdio_server
     
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="kokoro-tts",
-                server_version="1.0.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name="kokoro-tts",
+                    server_version="1.0.0",
+                    capabilities=server.get_capabilities(
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={},
+                    ),
                 ),
-            ),
-        )
+            )
+    finally:
+        await tts_client.aclose()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -8,29 +8,41 @@ import asyncio
 import argparse
 import logging
 import sys
-from kokoro_tts_mcp import server, InitializationOptions, NotificationOptions
+from contextlib import asynccontextmanager
+import mcp.types as types
+from kokoro_tts_mcp import (
+    server, tts_client, create_http_client, handle_call_tool, TOOL_LIST,
+    InitializationOptions, NotificationOptions
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("kokoro-tts-mcp-startup")
 
+def _flatten_mcp_result(result) -> str:
+    """Join the text parts of an MCP tool result."""
+    return "".join([item.text for item in result if isinstance(item, types.TextContent)])
+
 async def run_stdio_server():
     """Run MCP server using stdio (for direct integration with AI clients)."""
     from mcp.server.stdio import stdio_server
     
     logger.info("Starting MCP server in stdio mode...")
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="kokoro-tts",
-                server_version="1.0.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name="kokoro-tts",
+                    server_version="1.0.0",
+                    capabilities=server.get_capabilities(
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={},
+                    ),
                 ),
-            ),
-        )
+            )
+    finally:
+        await tts_client.aclose()
 
 async def run_http_server(host: str = "0.0.0.0", port: int = 3000):
     """Run MCP server in HTTP mode using FastAPI wrapper"""
@@ -42,7 +54,18 @@ async def run_http_server(host: str = "0.0.0.0", port: int = 3000):
         
         logger.info(f"Starting MCP server in HTTP mode on {host}:{port}...")
         
-        app = FastAPI(title="Kokoro TTS MCP Server", version="1.0.0")
+        @asynccontextmanager
+        async def lifespan(app: FastAPI):
+            # One pooled client shared by every tool call for the app's lifetime
+            async with create_http_client() as client:
+                app.state.client = client
+                await tts_client.use_http_client(client)
+                yield
+        
+        app = FastAPI(title="Kokoro TTS MCP Server", version="1.0.0", lifespan=lifespan)
+        
+        # The tool list never changes, so it is serialized once
+        tool_dumps = [tool.model_dump() for tool in TOOL_LIST]
         
         @app.get("/health")
         async def health_check():
@@ -51,13 +74,7 @@ async def run_http_server(host: str = "0.0.0.0", port: int = 3000):
         @app.get("/tools")
         async def list_tools():
             """List available MCP tools"""
-            try:
-                from kokoro_tts_mcp import handle_list_tools
-                tools = await handle_list_tools()
-                return {"tools": [tool.model_dump() for tool in tools]}
-            except Exception as e:
-                logger.error(f"Error listing tools: {e}")
-                return {"tools": []}
+            return {"tools": tool_dumps}
         
         @app.post("/v1/tools/list")
         async def list_tools_v1():
@@ -74,20 +91,12 @@ async def run_http_server(host: str = "0.0.0.0", port: int = 3000):
                 if not tool_name:
                     raise HTTPException(status_code=400, detail="Tool name is required")
                 
-                # Import the MCP tool handler
-                from kokoro_tts_mcp import handle_call_tool
-                
                 # Call the MCP server's tool handler
                 result = await handle_call_tool(tool_name, arguments)
                 
                 # Convert MCP result to JSON-serializable format
                 if result:
-                    result_text = ""
-                    for item in result:
-                        if hasattr(item, 'text'):
-                            result_text += item.text
-                        elif hasattr(item, 'type') and item.type == "text":
-                            result_text += getattr(item, 'text', str(item))
+                    result_text = _flatten_mcp_result(result)
                     return {"content": [{"type": "text", "text": result_text or str(result)}]}
                 else:
                     return {"content": [{"type": "text", "text": "Tool executed successfully"}]}
@@ -100,20 +109,12 @@ async def run_http_server(host: str = "0.0.0.0", port: int = 3000):
         async def call_tool(tool_name: str, request_data: dict):
             """Execute MCP tool"""
             try:
-                # Import the MCP tool handler
-                from kokoro_tts_mcp import handle_call_tool
-                
                 # Call the MCP server's tool handler
                 result = await handle_call_tool(tool_name, request_data)
                 
                 # Convert MCP result to JSON-serializable format
                 if result:
-                    result_text = ""
-                    for item in result:
-                        if hasattr(item, 'text'):
-                            result_text += item.text
-                        elif hasattr(item, 'type') and item.type == "text":
-                            result_text += getattr(item, 'text', str(item))
+                    result_text = _flatten_mcp_result(result)
                     return {"result": result_text or str(result)}
                 else:
                     return {"result": "Tool executed successfully"}